@@ -1,3 +1,4 @@
+import codecs
 import os
 import json
 import frappe
@@ -10,6 +11,9 @@ import hashlib
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 
+# Encodings tried, in order, for CSV files
+_CSV_ENCODINGS = ('utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1')
+
 class CSVConnector:
     """Enhanced CSV Connector with universal duplicate detection and improved error handling"""
     
@@ -17,11 +21,14 @@ class CSVConnector:
         self.logger = logger
         self.supported_formats = ['.csv', '.xlsx', '.xls']
         self.current_field_name = ''
-        
-        # Generate unique session ID for this import session
+        self.start_import_session()
+
+    def start_import_session(self) -> str:
+        """Generate a new import session ID, e.g. when a connector is reused for another run"""
         import frappe.utils
         self.import_session_id = frappe.utils.generate_hash()[:8]
         self.logger.logger.info(f"Starting new import session: {self.import_session_id}")
+        return self.import_session_id
 
     def convert_numpy_types(self, obj):
         """Convert numpy types to Python native types for JSON serialization"""
@@ -69,7 +76,7 @@ class CSVConnector:
         try:
             if file_ext == '.csv':
                 # Try multiple encodings with better error handling
-                encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
+                encodings = _CSV_ENCODINGS
                 df = None
                 encoding_used = None
                 
@@ -150,6 +157,53 @@ class CSVConnector:
             self.logger.logger.error(f"âŒ {error_msg}")
             raise Exception(error_msg)
 
+    def _detect_csv_encoding(self, file_path: str, block_size: int = 1 << 20) -> str:
+        """First candidate encoding that decodes the whole file, checked before any row is parsed"""
+        for encoding in _CSV_ENCODINGS:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                with open(file_path, 'rb') as f:
+                    for block in iter(lambda: f.read(block_size), b''):
+                        decoder.decode(block)
+                    decoder.decode(b'', final=True)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+        raise Exception(f"Failed to read file {Path(file_path).name} with any supported encoding")
+
+    def read_file_as_strings_iter(self, file_path: str, chunksize: int = 50_000):
+        """Yield a CSV as cleaned string DataFrame chunks; Excel files come back as a single frame
+
+        The encoding is settled for the whole file up front, so a decode error can never
+        surface after earlier chunks were already consumed. An empty file yields nothing.
+        """
+        if Path(file_path).suffix.lower() != '.csv':
+            yield self.read_file_as_strings(file_path)
+            return
+        
+        encoding = self._detect_csv_encoding(file_path)
+        try:
+            # dtype=str with na_filter off skips pandas' per-column type and NA inference
+            reader = pd.read_csv(
+                file_path,
+                dtype=str,
+                engine='c',
+                na_filter=False,
+                keep_default_na=False,
+                encoding=encoding,
+                on_bad_lines='skip',
+                chunksize=chunksize
+            )
+        except pd.errors.EmptyDataError:
+            return
+        
+        with reader:
+            for chunk in reader:
+                chunk.columns = chunk.columns.astype(str).str.strip()
+                chunk = chunk[~(chunk == '').all(axis=1)]
+                if not chunk.empty:
+                    yield chunk
+
     # Hash-Based Deduplication Methods
     def compute_stable_hash(self, row_data: dict, row_number: int = None) -> str:
         """
@@ -868,6 +922,10 @@ class CSVConnector:
         try:
             self.logger.logger.info(f"“¦ Starting to store {total_rows} rows in buffer for {target_doctype} (with mapping)")
 
+            # Rename columns once per frame instead of mapping every row's keys
+            if field_mappings:
+                df = df.rename(columns=field_mappings)
+
             batch_size = 50
             for batch_start in range(0, total_rows, batch_size):
                 batch_end = min(batch_start + batch_size, total_rows)
@@ -875,18 +933,8 @@ class CSVConnector:
 
                 for index, row in batch_df.iterrows():
                     try:
-                        raw_data = row.to_dict()
-
-                        # Apply field mappings if provided
-                        if field_mappings:
-                            mapped_data = {}
-                            for csv_field, value in raw_data.items():
-                                dt_field = field_mappings.get(csv_field, csv_field)
-                                mapped_data[dt_field] = str(value).strip() if value else ''
-                            raw_data = mapped_data
-                        else:
-                            # Clean values as strings
-                            raw_data = {k: str(v).strip() if v else '' for k, v in raw_data.items()}
+                        # Clean values as strings; columns already carry the mapped names
+                        raw_data = {k: str(v).strip() if v else '' for k, v in row.to_dict().items()}
 
                         buffer_doc = frappe.get_doc({
                             "doctype": "Migration Data Buffer",
@@ -1557,17 +1605,19 @@ class CSVConnector:
             self.logger.logger.error(f"âŒ Buffer cleanup failed: {str(e)}")
             return 0
     
-    def auto_detect_and_import(self, file_path: str, settings=None) -> Dict[str, Any]:
+    def auto_detect_and_import(self, file_path: str, settings=None, df: pd.DataFrame = None) -> Dict[str, Any]:
         """
          MAIN METHOD: Auto-detect existing DocType or create new, then import data
         
-        This replaces the manual DocType creation request workflow
+        This replaces the manual DocType creation request workflow.
+        Pass df when the file was already read with read_file_as_strings to skip parsing it again.
         """
         try:
             self.logger.logger.info(f" Starting auto-detection and import for: {Path(file_path).name}")
             
             # Step 1: Read and analyze CSV
-            df = self.read_file_as_strings(file_path)
+            if df is None:
+                df = self.read_file_as_strings(file_path)
             headers = list(df.columns)
             sample_data = df.head(3).to_dict('records')[0] if not df.empty else {}
             
@@ -1,7 +1,13 @@
 import frappe
 import os
 import re
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, FrozenSet, Iterable
+
+@lru_cache(maxsize=64)
+def _normalize_extensions(extensions: tuple) -> FrozenSet[str]:
+    """Lowercase an extension tuple once and cache the resulting set"""
+    return frozenset(ext.lower() for ext in extensions)
 
 class ConfigValidator:
     """Validates migration configuration and system requirements"""
@@ -129,13 +135,13 @@ class ConfigValidator:
             return False
     
     @staticmethod
-    def validate_file_extension(filename: str, allowed_extensions: List[str]) -> bool:
-        """Validate file has allowed extension"""
+    def validate_file_extension(filename: str, allowed_extensions: Iterable[str]) -> bool:
+        """Validate file has allowed extension (normalized extension sets are cached)"""
         if not filename or not allowed_extensions:
             return False
         
         file_ext = os.path.splitext(filename)[1].lower()
-        return file_ext in [ext.lower() for ext in allowed_extensions]
+        return file_ext in _normalize_extensions(tuple(allowed_extensions))
 
 # Hook this into migration settings validation
 def validate_on_settings_save(doc, method):
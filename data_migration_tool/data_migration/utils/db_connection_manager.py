@@ -1,11 +1,17 @@
 import frappe
+import logging
+import itertools
+import re
 import time
 import threading
 from contextlib import contextmanager
 from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum
 
+# Error messages that indicate a transient (degraded) rather than failed connection
+_DEGRADED_RE = re.compile(r'timeout|connection lost|server has gone away', re.IGNORECASE)
+
 class ConnectionState(Enum):
     """Database connection states"""
     HEALTHY = "healthy"
@@ -29,10 +35,14 @@ class DatabaseConnectionManager:
     """Enhanced database connection management with monitoring and recovery"""
     
     def __init__(self, max_retries: int = 3, retry_delay: float = 1.0, 
-                 slow_query_threshold: float = 5.0):
+                 slow_query_threshold: float = 5.0, enable_timing: bool = True,
+                 probe_interval: float = 2.0):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.slow_query_threshold = slow_query_threshold
+        self.enable_timing = enable_timing
+        self._probe_interval = probe_interval
+        self._last_probe_ts = 0.0
         self.metrics = ConnectionMetrics()
         self._lock = threading.Lock()
         self._connection_state = ConnectionState.HEALTHY
@@ -42,13 +52,16 @@ class DatabaseConnectionManager:
     def managed_connection(self, auto_retry: bool = True):
         """Context manager for database connections with automatic retry"""
         connection = None
-        start_time = time.time()
+        acquired = False
+        timed = self.enable_timing
+        start_time = time.perf_counter() if timed else 0.0
         
         try:
             connection = self._get_connection_with_retry() if auto_retry else self._get_connection()
             
             with self._lock:
                 self.metrics.active_connections += 1
+            acquired = True
             
             yield connection
             
@@ -57,15 +70,17 @@ class DatabaseConnectionManager:
             raise
         
         finally:
-            query_time = time.time() - start_time
+            query_time = time.perf_counter() - start_time if timed else 0.0
             
             with self._lock:
-                self.metrics.active_connections = max(0, self.metrics.active_connections - 1)
+                if acquired:
+                    self.metrics.active_connections -= 1
                 self.metrics.total_queries += 1
                 
-                if query_time > self.slow_query_threshold:
+                if timed and query_time > self.slow_query_threshold:
                     self.metrics.slow_queries += 1
-                    self.logger.warning(f"Slow query detected: {query_time:.2f}s")
+                    if self.logger.isEnabledFor(logging.WARNING):
+                        self.logger.warning("Slow query detected: %.2fs", query_time)
             
             if connection:
                 self._close_connection_safely(connection)
@@ -84,11 +99,12 @@ class DatabaseConnectionManager:
                 
                 if attempt == self.max_retries:
                     self._connection_state = ConnectionState.FAILED
-                    self.logger.error(f"Failed to connect to database after {self.max_retries + 1} attempts: {str(e)}")
+                    self.logger.error("Failed to connect to database after %d attempts: %s", self.max_retries + 1, e)
                     raise
                 
                 self._connection_state = ConnectionState.RECONNECTING
-                self.logger.warning(f"Database connection attempt {attempt + 1} failed, retrying in {self.retry_delay}s: {str(e)}")
+                self.logger.warning("Database connection attempt %d failed, retrying in %.2fs: %s",
+                                    attempt + 1, self.retry_delay, e)
                 
                 with self._lock:
                     self.metrics.reconnect_attempts += 1
@@ -104,14 +120,18 @@ class DatabaseConnectionManager:
             # Use Frappe's database connection
             if not frappe.db:
                 frappe.connect()
+                self._last_probe_ts = 0.0
             
-            # Test the connection
-            frappe.db.sql("SELECT 1", as_dict=True)
+            # Test the connection unless it was validated very recently
+            now = time.perf_counter()
+            if now - self._last_probe_ts >= self._probe_interval:
+                frappe.db.sql("SELECT 1", as_dict=True)
+                self._last_probe_ts = now
             
             return frappe.db
         
         except Exception as e:
-            self.logger.error(f"Failed to establish database connection: {str(e)}")
+            self.logger.error("Failed to establish database connection: %s", e)
             raise
     
     def _close_connection_safely(self, connection):
@@ -120,23 +140,25 @@ class DatabaseConnectionManager:
             if hasattr(connection, 'commit'):
                 connection.commit()
         except Exception as e:
-            self.logger.warning(f"Error during connection cleanup: {str(e)}")
+            self.logger.warning("Error during connection cleanup: %s", e)
     
     def _handle_connection_error(self, error: Exception):
         """Handle connection errors and update state"""
+        # Force a fresh health probe on the next connection request
+        self._last_probe_ts = 0.0
+        
         with self._lock:
             self.metrics.failed_attempts += 1
             self.metrics.last_error = str(error)
             self.metrics.last_error_time = time.time()
         
         # Determine connection state based on error
-        error_str = str(error).lower()
-        if any(keyword in error_str for keyword in ['timeout', 'connection lost', 'server has gone away']):
+        if _DEGRADED_RE.search(str(error)):
             self._connection_state = ConnectionState.DEGRADED
         else:
             self._connection_state = ConnectionState.FAILED
         
-        self.logger.error(f"Database connection error: {str(error)}")
+        self.logger.error("Database connection error: %s", error)
     
     def check_connection_health(self) -> Dict[str, Any]:
         """Check database connection health and return metrics"""
@@ -144,11 +166,8 @@ class DatabaseConnectionManager:
             start_time = time.time()
             
             with self.managed_connection(auto_retry=False) as db:
-                # Test basic connectivity
-                db.sql("SELECT 1 as test", as_dict=True)
-                
-                # Test write capability
-                db.sql("SELECT NOW() as current_time", as_dict=True)
+                # Test connectivity and server clock in a single round-trip
+                db.sql("SELECT 1 AS test, NOW() AS server_time", as_dict=True)
             
             response_time = time.time() - start_time
             
@@ -220,7 +239,9 @@ class DatabaseConnectionManager:
     def reset_metrics(self):
         """Reset connection metrics"""
         with self._lock:
-            self.metrics = ConnectionMetrics()
+            # Reset in place so references from get_connection_metrics() stay live
+            for metric_field in fields(self.metrics):
+                setattr(self.metrics, metric_field.name, metric_field.default)
             self._connection_state = ConnectionState.HEALTHY
 
 class DatabaseTransactionManager:
@@ -229,16 +250,18 @@ class DatabaseTransactionManager:
     def __init__(self, connection_manager: DatabaseConnectionManager):
         self.connection_manager = connection_manager
         self.logger = frappe.logger()
+        self._sp_counter = itertools.count()
     
     @contextmanager
     def transaction(self, auto_retry: bool = True):
         """Context manager for database transactions"""
         with self.connection_manager.managed_connection(auto_retry=auto_retry) as db:
-            savepoint_name = f"migration_sp_{int(time.time())}"
+            # Thread id + counter keeps names unique across concurrent workers
+            savepoint_name = f"mig_sp_{threading.get_ident():x}_{next(self._sp_counter):x}"
             
             try:
                 # Create savepoint
-                db.sql(f"SAVEPOINT {savepoint_name}")
+                db.savepoint(savepoint_name)
                 
                 yield db
                 
@@ -248,7 +271,7 @@ class DatabaseTransactionManager:
             except Exception as e:
                 self.logger.error(f"Transaction failed, rolling back to savepoint {savepoint_name}: {str(e)}")
                 try:
-                    db.sql(f"ROLLBACK TO SAVEPOINT {savepoint_name}")
+                    db.rollback(save_point=savepoint_name)
                 except Exception as rollback_error:
                     self.logger.error(f"Rollback failed: {str(rollback_error)}")
                     db.rollback()  # Full rollback as fallback
@@ -256,7 +279,7 @@ class DatabaseTransactionManager:
             
             finally:
                 try:
-                    db.sql(f"RELEASE SAVEPOINT {savepoint_name}")
+                    db.release_savepoint(savepoint_name)
                 except Exception as cleanup_error:
                     self.logger.warning(f"Failed to release savepoint: {str(cleanup_error)}")
 
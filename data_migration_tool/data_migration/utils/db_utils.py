@@ -24,7 +24,34 @@ class SafeDBOperations:
         except Exception as e:
             frappe.log_error(f"Database get_value failed for {doctype} - {str(e)}")
             return None
-    
+
+    @staticmethod
+    def safe_get_values_bulk(doctype: str, names: List[str], fieldname: str = "name",
+                             chunk_size: int = 1000) -> Dict[str, Any]:
+        """Safely fetch one field for many documents, returned as {name: value}"""
+        results = {}
+        if not doctype or not names:
+            return results
+
+        # Field and DocType names are interpolated, so only accept safe identifiers
+        if not re.match(r'^[A-Za-z0-9_]+$', fieldname) or not re.match(r'^[A-Za-z0-9 _-]+$', doctype):
+            frappe.log_error(f"Invalid bulk lookup target {doctype}.{fieldname}")
+            return results
+
+        unique_names = list(dict.fromkeys(names))
+        try:
+            for i in range(0, len(unique_names), chunk_size):
+                chunk = tuple(unique_names[i:i+chunk_size])
+                rows = frappe.db.sql(
+                    f"SELECT name, `{fieldname}` FROM `tab{doctype}` WHERE name IN %s",
+                    (chunk,)
+                )
+                results.update(rows)
+        except Exception as e:
+            frappe.log_error(f"Database bulk get_value failed for {doctype} - {str(e)}")
+
+        return results
+
     @staticmethod
     def generate_unique_name(doctype: str, base_name: str, max_attempts: int = 10000) -> str:
         """Generate unique name with reasonable limits"""
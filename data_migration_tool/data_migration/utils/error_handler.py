@@ -1,8 +1,17 @@
 import frappe
+import re
+import time
 import traceback
-from typing import Dict, Any, Optional, List
+from collections import ChainMap
+from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 class ErrorSeverity(Enum):
     """Error severity levels"""
     LOW = "low"
@@ -21,6 +30,161 @@ class ErrorCategory(Enum):
     SYSTEM = "system"
     NETWORK = "network"
 
+# Keyword table for error categorization, in priority order (first category wins)
+_CATEGORY_KEYWORDS = (
+    (ErrorCategory.SECURITY, ErrorSeverity.HIGH, ('permission', 'unauthorized', 'forbidden', 'security')),
+    (ErrorCategory.VALIDATION, ErrorSeverity.MEDIUM, ('invalid', 'required', 'missing', 'format')),
+    (ErrorCategory.RESOURCE, ErrorSeverity.HIGH, ('memory', 'disk', 'space', 'timeout', 'resource')),
+    (ErrorCategory.DATABASE, ErrorSeverity.HIGH, ('database', 'sql', 'connection', 'duplicate')),
+    (ErrorCategory.FILE_PROCESSING, ErrorSeverity.MEDIUM, ('file', 'csv', 'excel', 'path', 'encoding')),
+    (ErrorCategory.NETWORK, ErrorSeverity.MEDIUM, ('network', 'connection', 'timeout', 'url')),
+    (ErrorCategory.CONFIGURATION, ErrorSeverity.MEDIUM, ('config', 'setting', 'parameter')),
+)
+
+# keyword -> (priority, category, severity); shared keywords keep their highest-priority category
+_KEYWORD_MAP = {}
+for _priority, (_category, _severity, _keywords) in enumerate(_CATEGORY_KEYWORDS):
+    for _keyword in _keywords:
+        _KEYWORD_MAP.setdefault(_keyword, (_priority, _category, _severity))
+
+_KEYWORD_RE = re.compile('|'.join(re.escape(kw) for kw in sorted(_KEYWORD_MAP, key=len, reverse=True)))
+
+# Aho-Corasick automaton finds every keyword in one pass; the regex is the fallback
+_KEYWORD_AUTOMATON = None
+if AHOCORASICK_AVAILABLE:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _entry in _KEYWORD_MAP.items():
+        _KEYWORD_AUTOMATON.add_word(_keyword, _entry)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+def _iter_keyword_matches(text: str):
+    """Yield (priority, category, severity) for each keyword found in text"""
+    if _KEYWORD_AUTOMATON is not None:
+        for _end, entry in _KEYWORD_AUTOMATON.iter(text):
+            yield entry
+    else:
+        for match in _KEYWORD_RE.finditer(text):
+            yield _KEYWORD_MAP[match.group(0)]
+
+# User message templates per category, rendered against the error context
+_MSG_TEMPLATES: Dict[ErrorCategory, str] = {
+    ErrorCategory.FILE_PROCESSING: "Error processing file '{filename}': {message}",
+    ErrorCategory.VALIDATION: "Validation error in field '{field_name}': {message}",
+    ErrorCategory.DATABASE: "Database error while working with '{doctype}': {message}",
+    ErrorCategory.RESOURCE: "Resource limit exceeded during {operation}: {message}",
+    ErrorCategory.SECURITY: "Security validation failed: {message}",
+    ErrorCategory.CONFIGURATION: "Configuration error in {setting_name}: {message}",
+}
+_FILE_LINE_TEMPLATE = "Error processing file '{filename}' at line {line_number}: {message}"
+_DEFAULT_TEMPLATE = "{message}"
+
+_MSG_DEFAULTS = {
+    'filename': 'Unknown file',
+    'field_name': 'Unknown field',
+    'doctype': 'Unknown DocType',
+    'operation': 'unknown operation',
+    'setting_name': 'configuration',
+}
+
+# Actionable suggestions per category
+_SUGGESTIONS: Dict[ErrorCategory, Tuple[str, ...]] = {
+    ErrorCategory.FILE_PROCESSING: (
+        "Check if the file format is supported (.csv, .xlsx, .xls)",
+        "Verify the file is not corrupted or empty",
+        "Ensure the file encoding is UTF-8",
+        "Try reducing the file size by splitting into smaller files"
+    ),
+    ErrorCategory.VALIDATION: (
+        "Check the data format matches the expected field type",
+        "Verify all required fields have values",
+        "Remove any special characters that might be causing issues",
+        "Check the Migration Settings configuration"
+    ),
+    ErrorCategory.DATABASE: (
+        "Check database connectivity",
+        "Verify the DocType exists and is accessible",
+        "Check user permissions for the target DocType",
+        "Ensure the database has sufficient space"
+    ),
+    ErrorCategory.RESOURCE: (
+        "Reduce the file size or process in smaller batches",
+        "Free up system memory by closing other applications",
+        "Check available disk space",
+        "Consider increasing system resources"
+    ),
+    ErrorCategory.SECURITY: (
+        "Verify user has necessary permissions",
+        "Check file path for invalid characters",
+        "Ensure file is from a trusted source",
+        "Contact system administrator if issue persists"
+    ),
+    ErrorCategory.CONFIGURATION: (
+        "Check Migration Settings configuration",
+        "Verify all required fields are filled",
+        "Check environment variables and site configuration",
+        "Contact administrator to review settings"
+    ),
+    ErrorCategory.NETWORK: (
+        "Check internet connection",
+        "Verify API credentials are correct",
+        "Check if external services are accessible",
+        "Retry the operation after some time"
+    ),
+}
+_DEFAULT_SUGGESTIONS: Tuple[str, ...] = (
+    "Check the system logs for more details",
+    "Retry the operation",
+    "Contact support if the issue persists"
+)
+
+# Message indicator colour per severity value
+_SEVERITY_INDICATORS = {
+    ErrorSeverity.CRITICAL.value: 'red',
+    ErrorSeverity.HIGH.value: 'red',
+    ErrorSeverity.MEDIUM.value: 'orange',
+    ErrorSeverity.LOW.value: 'blue',
+}
+
+# severity value -> (logger method, message prefix) used by handle_error
+_LOG_DISPATCH = {
+    ErrorSeverity.CRITICAL.value: ('critical', '💥 CRITICAL ERROR'),
+    ErrorSeverity.HIGH.value: ('error', '❌ ERROR'),
+    ErrorSeverity.MEDIUM.value: ('warning', '⚠️ WARNING'),
+}
+_DEFAULT_LOG_DISPATCH = ('info', 'ℹ️ INFO')
+
+# developer_mode per site, read once per process
+_dev_mode_by_site: Dict[Optional[str], bool] = {}
+
+def _is_dev_mode() -> bool:
+    """Return the cached developer_mode flag for the current site"""
+    site = getattr(frappe.local, 'site', None)
+    try:
+        return _dev_mode_by_site[site]
+    except KeyError:
+        dev_mode = _dev_mode_by_site[site] = bool(frappe.conf.get('developer_mode'))
+        return dev_mode
+
+# (second, site) -> formatted frappe.utils.now(); error bursts share one timestamp per second
+_now_cache = [None, '']
+
+def _fast_now() -> str:
+    """Return frappe.utils.now(), recomputed at most once per second per site"""
+    key = (int(time.time()), getattr(frappe.local, 'site', None))
+    if key != _now_cache[0]:
+        _now_cache[:] = [key, frappe.utils.now()]
+    return _now_cache[1]
+
+def _copy_error_info(error_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a cached error payload with its own suggestions and context, and a fresh timestamp and traceback"""
+    return {
+        **error_info,
+        'suggestions': list(error_info['suggestions']),
+        'context': dict(error_info['context']),
+        'timestamp': _fast_now(),
+        'traceback': traceback.format_exc() if _is_dev_mode() else None
+    }
+
 class MigrationError(Exception):
     """Custom exception for migration operations"""
     
@@ -32,6 +196,10 @@ class MigrationError(Exception):
         self.severity = severity
         self.context = context or {}
         self.suggestions = suggestions or []
+        
+        # Filled in by UserFriendlyErrorHandler on first format
+        self._formatted = None
+        self._formatted_context = None
 
 class UserFriendlyErrorHandler:
     """Handles errors with user-friendly messages and actionable suggestions"""
@@ -41,10 +209,17 @@ class UserFriendlyErrorHandler:
     
     def format_error_message(self, error: Exception, context: Dict = None) -> Dict[str, Any]:
         """Format error message with context and suggestions"""
+        is_migration_error = isinstance(error, MigrationError)
+        
+        # A MigrationError re-raised through several handlers is categorized only once per context
+        if is_migration_error and error._formatted is not None and error._formatted_context == context:
+            return _copy_error_info(error._formatted)
+        
+        call_context = context
         context = context or {}
         
         # Determine error category and severity
-        if isinstance(error, MigrationError):
+        if is_migration_error:
             category = error.category
             severity = error.severity
             suggestions = error.suggestions
@@ -58,7 +233,7 @@ class UserFriendlyErrorHandler:
         if not suggestions:
             suggestions = self._get_suggestions(error, category, context)
         
-        return {
+        error_info = {
             'error_type': type(error).__name__,
             'category': category.value,
             'severity': severity.value,
@@ -66,163 +241,55 @@ class UserFriendlyErrorHandler:
             'technical_message': str(error),
             'suggestions': suggestions,
             'context': context,
-            'timestamp': frappe.utils.now(),
-            'traceback': traceback.format_exc() if frappe.conf.get('developer_mode') else None
+            'timestamp': _fast_now(),
+            'traceback': traceback.format_exc() if _is_dev_mode() else None
         }
+        
+        if is_migration_error:
+            # Cache a private copy, keyed on a snapshot of the context, so callers can't mutate it
+            error._formatted = {**error_info, 'suggestions': list(suggestions), 'context': dict(context)}
+            error._formatted_context = dict(call_context) if call_context is not None else None
+        
+        return error_info
     
     def _categorize_error(self, error: Exception, context: Dict) -> tuple:
         """Categorize error and determine severity"""
         error_str = str(error).lower()
-        error_type = type(error).__name__
-        
-        # Security errors
-        if any(keyword in error_str for keyword in ['permission', 'unauthorized', 'forbidden', 'security']):
-            return ErrorCategory.SECURITY, ErrorSeverity.HIGH, []
-        
-        # Validation errors
-        if any(keyword in error_str for keyword in ['invalid', 'required', 'missing', 'format']):
-            return ErrorCategory.VALIDATION, ErrorSeverity.MEDIUM, []
         
-        # Resource errors
-        if any(keyword in error_str for keyword in ['memory', 'disk', 'space', 'timeout', 'resource']):
-            return ErrorCategory.RESOURCE, ErrorSeverity.HIGH, []
+        # Single pass over the message; keep the match with the highest category priority
+        best = None
+        for entry in _iter_keyword_matches(error_str):
+            if best is None or entry[0] < best[0]:
+                best = entry
+                if best[0] == 0:
+                    break
         
-        # Database errors
-        if any(keyword in error_str for keyword in ['database', 'sql', 'connection', 'duplicate']):
-            return ErrorCategory.DATABASE, ErrorSeverity.HIGH, []
-        
-        # File processing errors
-        if any(keyword in error_str for keyword in ['file', 'csv', 'excel', 'path', 'encoding']):
-            return ErrorCategory.FILE_PROCESSING, ErrorSeverity.MEDIUM, []
-        
-        # Network errors
-        if any(keyword in error_str for keyword in ['network', 'connection', 'timeout', 'url']):
-            return ErrorCategory.NETWORK, ErrorSeverity.MEDIUM, []
-        
-        # Configuration errors
-        if any(keyword in error_str for keyword in ['config', 'setting', 'parameter']):
-            return ErrorCategory.CONFIGURATION, ErrorSeverity.MEDIUM, []
+        if best is not None:
+            return best[1], best[2], []
         
         # Default to system error
         return ErrorCategory.SYSTEM, ErrorSeverity.MEDIUM, []
     
     def _create_user_message(self, error: Exception, category: ErrorCategory, context: Dict) -> str:
         """Create user-friendly error message"""
-        base_message = str(error)
-        
-        # Add context-specific information
-        if category == ErrorCategory.FILE_PROCESSING:
-            file_name = context.get('filename', 'Unknown file')
-            line_number = context.get('line_number')
-            if line_number:
-                return f"Error processing file '{file_name}' at line {line_number}: {base_message}"
-            else:
-                return f"Error processing file '{file_name}': {base_message}"
-        
-        elif category == ErrorCategory.VALIDATION:
-            field_name = context.get('field_name', 'Unknown field')
-            return f"Validation error in field '{field_name}': {base_message}"
-        
-        elif category == ErrorCategory.DATABASE:
-            doctype = context.get('doctype', 'Unknown DocType')
-            return f"Database error while working with '{doctype}': {base_message}"
-        
-        elif category == ErrorCategory.RESOURCE:
-            operation = context.get('operation', 'unknown operation')
-            return f"Resource limit exceeded during {operation}: {base_message}"
-        
-        elif category == ErrorCategory.SECURITY:
-            return f"Security validation failed: {base_message}"
-        
-        elif category == ErrorCategory.CONFIGURATION:
-            setting_name = context.get('setting_name', 'configuration')
-            return f"Configuration error in {setting_name}: {base_message}"
-        
+        if category == ErrorCategory.FILE_PROCESSING and context.get('line_number'):
+            template = _FILE_LINE_TEMPLATE
         else:
-            return base_message
+            template = _MSG_TEMPLATES.get(category, _DEFAULT_TEMPLATE)
+        
+        return template.format_map(ChainMap({'message': str(error)}, context, _MSG_DEFAULTS))
     
     def _get_suggestions(self, error: Exception, category: ErrorCategory, context: Dict) -> List[str]:
         """Get actionable suggestions based on error category"""
-        suggestions = []
-        
-        if category == ErrorCategory.FILE_PROCESSING:
-            suggestions.extend([
-                "Check if the file format is supported (.csv, .xlsx, .xls)",
-                "Verify the file is not corrupted or empty",
-                "Ensure the file encoding is UTF-8",
-                "Try reducing the file size by splitting into smaller files"
-            ])
-        
-        elif category == ErrorCategory.VALIDATION:
-            suggestions.extend([
-                "Check the data format matches the expected field type",
-                "Verify all required fields have values",
-                "Remove any special characters that might be causing issues",
-                "Check the Migration Settings configuration"
-            ])
-        
-        elif category == ErrorCategory.DATABASE:
-            suggestions.extend([
-                "Check database connectivity",
-                "Verify the DocType exists and is accessible",
-                "Check user permissions for the target DocType",
-                "Ensure the database has sufficient space"
-            ])
-        
-        elif category == ErrorCategory.RESOURCE:
-            suggestions.extend([
-                "Reduce the file size or process in smaller batches",
-                "Free up system memory by closing other applications",
-                "Check available disk space",
-                "Consider increasing system resources"
-            ])
-        
-        elif category == ErrorCategory.SECURITY:
-            suggestions.extend([
-                "Verify user has necessary permissions",
-                "Check file path for invalid characters",
-                "Ensure file is from a trusted source",
-                "Contact system administrator if issue persists"
-            ])
-        
-        elif category == ErrorCategory.CONFIGURATION:
-            suggestions.extend([
-                "Check Migration Settings configuration",
-                "Verify all required fields are filled",
-                "Check environment variables and site configuration",
-                "Contact administrator to review settings"
-            ])
-        
-        elif category == ErrorCategory.NETWORK:
-            suggestions.extend([
-                "Check internet connection",
-                "Verify API credentials are correct",
-                "Check if external services are accessible",
-                "Retry the operation after some time"
-            ])
-        
-        else:
-            suggestions.extend([
-                "Check the system logs for more details",
-                "Retry the operation",
-                "Contact support if the issue persists"
-            ])
-        
-        return suggestions
+        return list(_SUGGESTIONS.get(category, _DEFAULT_SUGGESTIONS))
     
     def handle_error(self, error: Exception, context: Dict = None, notify_user: bool = True) -> Dict[str, Any]:
         """Handle error with logging and user notification"""
         error_info = self.format_error_message(error, context)
         
         # Log error with appropriate level
-        if error_info['severity'] == ErrorSeverity.CRITICAL.value:
-            self.logger.critical(f"💥 CRITICAL ERROR: {error_info['user_message']}", extra=error_info)
-        elif error_info['severity'] == ErrorSeverity.HIGH.value:
-            self.logger.error(f"❌ ERROR: {error_info['user_message']}", extra=error_info)
-        elif error_info['severity'] == ErrorSeverity.MEDIUM.value:
-            self.logger.warning(f"⚠️ WARNING: {error_info['user_message']}", extra=error_info)
-        else:
-            self.logger.info(f"ℹ️ INFO: {error_info['user_message']}", extra=error_info)
+        level, prefix = _LOG_DISPATCH.get(error_info['severity'], _DEFAULT_LOG_DISPATCH)
+        getattr(self.logger, level)(f"{prefix}: {error_info['user_message']}", extra=error_info)
         
         # Notify user if requested
         if notify_user and frappe.local.request:
@@ -233,21 +300,18 @@ class UserFriendlyErrorHandler:
     def _notify_user(self, error_info: Dict[str, Any]):
         """Send user notification about the error"""
         try:
+            suggestions = error_info['suggestions']
+            
             # Determine message indicator based on severity
-            if error_info['severity'] in [ErrorSeverity.CRITICAL.value, ErrorSeverity.HIGH.value]:
-                indicator = 'red'
-            elif error_info['severity'] == ErrorSeverity.MEDIUM.value:
-                indicator = 'orange'
-            else:
-                indicator = 'blue'
+            indicator = _SEVERITY_INDICATORS.get(error_info['severity'], 'blue')
             
             # Create notification message
             message = error_info['user_message']
-            if error_info['suggestions']:
-                message += f"<br><br><strong>Suggestions:</strong><ul>"
-                for suggestion in error_info['suggestions'][:3]:  # Limit to 3 suggestions
-                    message += f"<li>{suggestion}</li>"
-                message += "</ul>"
+            if suggestions:
+                # Limit to 3 suggestions
+                items = ''.join(f"<li>{frappe.utils.escape_html(suggestion)}</li>"
+                                for suggestion in suggestions[:3])
+                message = f"{message}<br><br><strong>Suggestions:</strong><ul>{items}</ul>"
             
             frappe.msgprint(message, indicator=indicator, title=f"{error_info['category'].title()} Error")
             
@@ -4,6 +4,18 @@ from frappe.utils.logger import set_log_level
 from typing import Dict, Any
 import json
 
+class _LazyJSON:
+    """Defers json.dumps until a log record is actually formatted"""
+    __slots__ = ('obj',)
+    
+    def __init__(self, obj):
+        self.obj = obj
+    
+    def __str__(self):
+        return json.dumps(self.obj, default=str)
+    
+    __repr__ = __str__
+
 class MigrationLogger:
     def __init__(self, module_name: str = "data_migration"):
         self.module_name = module_name
@@ -54,11 +66,13 @@ class MigrationLogger:
         self.logger.info(f"🏗️ New DocType created", extra={
             "doctype_name": doctype_name,
             "field_count": len(fields),
-            "fields": json.dumps(fields)
+            "fields": _LazyJSON(fields)
         })
     
     def log_field_mapping(self, source_field: str, target_field: str, doctype: str):
         """Log field mapping decisions"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         self.logger.debug(f"🔗 Field mapped", extra={
             "source_field": source_field,
             "target_field": target_field,
@@ -67,10 +81,13 @@ class MigrationLogger:
     
     def log_error(self, error: Exception, context: Dict[str, Any]):
         """Log errors with full context"""
+        # Skip the traceback walk entirely when ERROR records would be dropped
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         self.logger.error(f"💥 Migration error: {str(error)}", extra={
             "error_type": type(error).__name__,
             "error_message": str(error),
-            "context": json.dumps(context),
+            "context": _LazyJSON(context),
             "traceback": frappe.get_traceback()
         })
 
@@ -1,14 +1,26 @@
 import gc
+import os
 import psutil
 import threading
 import time
 import weakref
+from itertools import islice
 from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass, field
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 import frappe
 
-@dataclass
+_INV_MB = 1.0 / 1048576
+
+# On Linux, RSS is read straight from /proc/self/statm (second field, in pages)
+_STATM_PATH = '/proc/self/statm'
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+_USE_STATM = _PAGE_SIZE is not None and os.path.exists(_STATM_PATH)
+
+@dataclass(slots=True)
 class MemoryMetrics:
     """Memory usage metrics"""
     current_usage_mb: float = 0.0
@@ -23,24 +35,33 @@ class MemoryLeakDetector:
     """Detects and prevents memory leaks during migration operations"""
     
     def __init__(self, warning_threshold_mb: float = 500.0, critical_threshold_mb: float = 1000.0,
-                 monitoring_interval: float = 30.0):
+                 monitoring_interval: float = 30.0, max_monitoring_interval: float = 240.0,
+                 stable_delta_mb: float = 5.0, stable_iterations: int = 3):
         self.warning_threshold_mb = warning_threshold_mb
         self.critical_threshold_mb = critical_threshold_mb
         self.monitoring_interval = monitoring_interval
+        self.max_monitoring_interval = max(monitoring_interval, max_monitoring_interval)
+        self.stable_delta_mb = stable_delta_mb
+        self.stable_iterations = stable_iterations
         self.metrics = MemoryMetrics(threshold_mb=critical_threshold_mb)
         self.logger = frappe.logger()
         
         # Object tracking
         self._tracked_objects = weakref.WeakSet()
         self._object_counts = {}
+        self._counts_dirty = False
+        self._gc_collections = 0
         self._lock = threading.Lock()
         
         # Monitoring thread
         self._monitoring_active = False
         self._monitor_thread = None
         
-        # Cleanup callbacks
-        self._cleanup_callbacks = []
+        # Cached process handle (recreated after fork)
+        self._process = None
+        
+        # Cleanup callbacks (insertion-ordered dict used as an ordered set)
+        self._cleanup_callbacks: Dict[Callable, None] = {}
     
     def start_monitoring(self):
         """Start memory monitoring in background thread"""
@@ -59,36 +80,65 @@ class MemoryLeakDetector:
             self._monitor_thread.join(timeout=5.0)
         self.logger.info("Memory leak detector stopped")
     
+    def _get_process(self) -> psutil.Process:
+        """Get the cached psutil handle for the current process"""
+        process = self._process
+        if process is None or process.pid != os.getpid():
+            process = self._process = psutil.Process()
+        return process
+    
     def _monitor_memory(self):
-        """Background memory monitoring"""
+        """Background memory monitoring with back-off while usage is stable"""
+        interval = self.monitoring_interval
+        last_usage = None
+        stable_count = 0
+        
         while self._monitoring_active:
             try:
                 self._update_metrics()
                 self._check_thresholds()
-                time.sleep(self.monitoring_interval)
+                
+                current_usage = self.metrics.current_usage_mb
+                if last_usage is not None and abs(current_usage - last_usage) < self.stable_delta_mb:
+                    stable_count += 1
+                    if stable_count >= self.stable_iterations:
+                        interval = min(interval * 2, self.max_monitoring_interval)
+                        stable_count = 0
+                else:
+                    stable_count = 0
+                    interval = self.monitoring_interval
+                last_usage = current_usage
+                
+                time.sleep(interval)
             except Exception as e:
                 self.logger.error(f"Memory monitoring error: {str(e)}")
                 time.sleep(self.monitoring_interval)
     
     def _update_metrics(self):
-        """Update memory usage metrics"""
-        process = psutil.Process()
-        memory_info = process.memory_info()
+        """Update memory usage metrics by publishing a fresh snapshot"""
         system_memory = psutil.virtual_memory()
         
-        current_mb = memory_info.rss / 1024 / 1024
-        available_mb = system_memory.available / 1024 / 1024
+        current_mb = self._fast_rss_mb()
+        available_mb = system_memory.available * _INV_MB
+        previous = self.metrics
         
-        with self._lock:
-            self.metrics.current_usage_mb = current_mb
-            self.metrics.available_mb = available_mb
-            
-            if current_mb > self.metrics.peak_usage_mb:
-                self.metrics.peak_usage_mb = current_mb
-            
-            # Update object counts
-            self.metrics.weak_references = len(self._tracked_objects)
-            self.metrics.active_objects = dict(self._object_counts)
+        # Only the object counts need the lock, and only when they changed
+        active_objects = previous.active_objects
+        if self._counts_dirty:
+            with self._lock:
+                active_objects = dict(self._object_counts)
+                self._counts_dirty = False
+        
+        # Readers grab self.metrics without locking; the swap is a single assignment
+        self.metrics = MemoryMetrics(
+            current_usage_mb=current_mb,
+            peak_usage_mb=max(previous.peak_usage_mb, current_mb),
+            available_mb=available_mb,
+            threshold_mb=previous.threshold_mb,
+            gc_collections=self._gc_collections,
+            active_objects=active_objects,
+            weak_references=len(self._tracked_objects)
+        )
     
     def _check_thresholds(self):
         """Check memory thresholds and take action"""
@@ -108,10 +158,11 @@ class MemoryLeakDetector:
         
         # Run garbage collection
         collected = gc.collect()
-        self.metrics.gc_collections += 1
+        self._gc_collections += 1
+        self.metrics.gc_collections = self._gc_collections
         
         # Execute cleanup callbacks
-        for callback in self._cleanup_callbacks:
+        for callback in list(self._cleanup_callbacks):
             try:
                 callback()
             except Exception as e:
@@ -131,9 +182,10 @@ class MemoryLeakDetector:
         with self._lock:
             self._tracked_objects.clear()
             self._object_counts.clear()
+            self._counts_dirty = True
         
         # Execute emergency cleanup callbacks
-        for callback in self._cleanup_callbacks:
+        for callback in list(self._cleanup_callbacks):
             try:
                 callback()
             except Exception as e:
@@ -156,29 +208,29 @@ class MemoryLeakDetector:
         with self._lock:
             self._tracked_objects.add(obj)
             self._object_counts[object_type] = self._object_counts.get(object_type, 0) + 1
+            self._counts_dirty = True
     
     def add_cleanup_callback(self, callback: Callable):
         """Add a cleanup callback function"""
-        self._cleanup_callbacks.append(callback)
+        self._cleanup_callbacks[callback] = None
     
     def remove_cleanup_callback(self, callback: Callable):
         """Remove a cleanup callback function"""
-        if callback in self._cleanup_callbacks:
-            self._cleanup_callbacks.remove(callback)
+        self._cleanup_callbacks.pop(callback, None)
     
     @contextmanager
     def memory_monitor(self, operation_name: str = "operation"):
         """Context manager for monitoring memory during operations"""
-        start_memory = self.get_current_memory_usage()
-        start_time = time.time()
+        start_memory = self._fast_rss_mb()
+        start_time = time.monotonic()
         
         self.logger.info(f"Starting {operation_name} - Memory: {start_memory:.1f}MB")
         
         try:
             yield self
         finally:
-            end_memory = self.get_current_memory_usage()
-            end_time = time.time()
+            end_memory = self._fast_rss_mb()
+            end_time = time.monotonic()
             duration = end_time - start_time
             memory_diff = end_memory - start_memory
             
@@ -188,10 +240,16 @@ class MemoryLeakDetector:
             else:
                 self.logger.info(f"Completed {operation_name} - Memory: {end_memory:.1f}MB ({memory_diff:+.1f}MB, Duration: {duration:.1f}s)")
     
+    def _fast_rss_mb(self) -> float:
+        """Read process RSS in MB without touching metrics or the lock"""
+        if _USE_STATM:
+            with open(_STATM_PATH, 'rb') as statm:
+                return int(statm.read().split()[1]) * _PAGE_SIZE * _INV_MB
+        return self._get_process().memory_info().rss * _INV_MB
+    
     def get_current_memory_usage(self) -> float:
         """Get current memory usage in MB"""
-        process = psutil.Process()
-        return process.memory_info().rss / 1024 / 1024
+        return self._fast_rss_mb()
     
     def get_memory_metrics(self) -> MemoryMetrics:
         """Get current memory metrics"""
@@ -205,8 +263,10 @@ class MemoryLeakDetector:
     def reset_metrics(self):
         """Reset memory metrics"""
         with self._lock:
-            self.metrics = MemoryMetrics(threshold_mb=self.critical_threshold_mb)
             self._object_counts.clear()
+            self._counts_dirty = False
+            self._gc_collections = 0
+        self.metrics = MemoryMetrics(threshold_mb=self.critical_threshold_mb)
 
 class MemoryEfficientProcessor:
     """Memory-efficient data processing utilities"""
@@ -223,15 +283,18 @@ class MemoryEfficientProcessor:
         
         try:
             for batch in self._chunk_data(data_source, batch_size):
-                with self.memory_detector.memory_monitor(f"batch_{batch_count}"):
+                # Sample memory around every Nth batch instead of every batch
+                if batch_count % memory_check_interval == 0:
+                    monitor = self.memory_detector.memory_monitor(f"batch_{batch_count}")
+                else:
+                    monitor = nullcontext()
+                
+                with monitor:
                     # Process batch
                     results = processor_func(batch)
                     processed_count += len(batch)
                     batch_count += 1
                     
-                    # Track batch for memory monitoring
-                    self.memory_detector.track_object(batch, "processing_batch")
-                    
                     # Periodic memory check
                     if batch_count % memory_check_interval == 0:
                         current_memory = self.memory_detector.get_current_memory_usage()
@@ -246,9 +309,9 @@ class MemoryEfficientProcessor:
                     if 'results' in locals():
                         del results
                     
-                    # Force garbage collection every 50 batches
+                    # Collect the young generation every 50 batches; batches are short-lived
                     if batch_count % 50 == 0:
-                        gc.collect()
+                        gc.collect(0)
         
         except Exception as e:
             self.logger.error(f"Error in memory-efficient processing: {str(e)}")
@@ -261,21 +324,19 @@ class MemoryEfficientProcessor:
     
     def _chunk_data(self, data_source, chunk_size: int):
         """Chunk data source into manageable pieces"""
-        if hasattr(data_source, '__len__'):
-            # List-like data source
+        if hasattr(data_source, 'iloc'):
+            # DataFrame-like source: positional slices are views, not copies
             for i in range(0, len(data_source), chunk_size):
-                yield data_source[i:i + chunk_size]
-        else:
-            # Iterator-like data source
-            chunk = []
-            for item in data_source:
-                chunk.append(item)
-                if len(chunk) >= chunk_size:
-                    yield chunk
-                    chunk = []
-            
-            if chunk:  # Yield remaining items
-                yield chunk
+                yield data_source.iloc[i:i + chunk_size]
+            return
+        
+        # Any other iterable is consumed lazily without slice copies
+        iterator = iter(data_source)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
     
     @contextmanager
     def memory_limited_operation(self, max_memory_mb: float = 100.0):
@@ -1,7 +1,68 @@
 import os
 import frappe
+from types import MappingProxyType, SimpleNamespace
 from typing import Dict, Any, Optional, Union
 
+_UNSET = object()
+
+# Environment string converters keyed by the type of the default value
+_ENV_CONVERTERS = {
+    bool: lambda value: value.lower() in ('true', '1', 'yes', 'on'),
+    int: int,
+    float: float,
+    # Assume comma-separated values
+    list: lambda value: [item.strip() for item in value.split(',') if item.strip()],
+}
+
+def _identity(value):
+    return value
+
+# Environment variable names read before these limits moved into MigrationConfig,
+# still honoured (after the MIGRATION_<KEY> name) so existing deployments keep their overrides
+_LEGACY_ENV_KEYS = {
+    'MAX_FILE_SIZE_MB': ('MIGRATION_MAX_FILE_MB',),
+    'MAX_OPERATION_TIME_SECONDS': ('MIGRATION_MAX_OPERATION_TIME', 'MIGRATION_MAX_TIME_SECONDS'),
+    'MIN_AVAILABLE_MEMORY_MB': ('MIGRATION_MIN_MEMORY_MB',),
+}
+
+# Keys read in tight loops, exposed as attributes on MigrationConfig.HOT
+_HOT_KEYS = ('BATCH_SIZE', 'CHUNK_SIZE', 'MAX_MEMORY_PERCENT', 'MAX_CPU_PERCENT')
+
+# Field name -> config key for each limits bundle returned by the get_*_limits helpers
+_LIMIT_BUNDLES = {
+    'file': {
+        'max_size_mb': 'MAX_FILE_SIZE_MB',
+        'chunk_size': 'CHUNK_SIZE',
+        'supported_extensions': 'SUPPORTED_EXTENSIONS',
+        'max_filename_length': 'MAX_FILENAME_LENGTH'
+    },
+    'performance': {
+        'max_memory_mb': 'MAX_MEMORY_MB',
+        'min_available_memory_mb': 'MIN_AVAILABLE_MEMORY_MB',
+        'max_memory_percent': 'MAX_MEMORY_PERCENT',
+        'max_cpu_percent': 'MAX_CPU_PERCENT',
+        'max_operation_time_seconds': 'MAX_OPERATION_TIME_SECONDS'
+    },
+    'database': {
+        'max_name_attempts': 'MAX_NAME_GENERATION_ATTEMPTS',
+        'batch_size': 'BATCH_SIZE',
+        'max_retries': 'MAX_RETRIES',
+        'timeout_seconds': 'DB_TIMEOUT_SECONDS'
+    },
+    'field_type': {
+        'data_field_max_length': 'DATA_FIELD_MAX_LENGTH',
+        'small_text_max_length': 'SMALL_TEXT_MAX_LENGTH',
+        'medium_text_max_length': 'MEDIUM_TEXT_MAX_LENGTH',
+        'phone_min_length': 'PHONE_MIN_LENGTH',
+        'email_max_length': 'EMAIL_MAX_LENGTH'
+    },
+    'security': {
+        'allowed_mime_types': 'ALLOWED_MIME_TYPES',
+        'max_path_depth': 'MAX_PATH_DEPTH',
+        'forbidden_path_components': 'FORBIDDEN_PATH_COMPONENTS'
+    }
+}
+
 class MigrationConfig:
     """Centralized configuration management for data migration"""
     
@@ -35,6 +96,7 @@ class MigrationConfig:
         
         # Concurrency
         'MAX_CONCURRENT_JOBS': 5,
+        'MAX_FILE_WORKERS': 1,
         'FILE_LOCK_TIMEOUT_SECONDS': 300,
         'OPERATION_TIMEOUT_SECONDS': 300,
         
@@ -65,108 +127,121 @@ class MigrationConfig:
     
     def __init__(self):
         self._config_cache = {}
+        self._settings = _UNSET
         self._load_config()
     
     def _load_config(self):
-        """Load configuration from various sources with priority order"""
+        """Reset configuration state; values are resolved lazily on first get()"""
+        self._config_cache.clear()
+        self._settings = _UNSET
+        self._hot = None
+        self._env_vars = None
+        self._limit_bundles = {}
+    
+    @property
+    def HOT(self) -> SimpleNamespace:
+        """Hot keys as plain attributes, e.g. migration_config.HOT.batch_size"""
+        hot = self._hot
+        if hot is None:
+            hot = self._hot = SimpleNamespace(**{key.lower(): self.get(key) for key in _HOT_KEYS})
+        return hot
+    
+    def _get_settings(self):
+        """Load Migration Settings once per config load (None if unavailable)"""
+        if self._settings is _UNSET:
+            try:
+                self._settings = frappe.get_cached_doc('Migration Settings')
+            except Exception:
+                self._settings = None  # Use defaults if settings not available
+        return self._settings
+    
+    def _resolve(self, key: str) -> Any:
+        """Resolve a single key from the configured sources"""
         # Priority: Environment Variables > Site Config > Frappe Settings > Defaults
+        default_value = self.DEFAULTS[key]
+        
+        # 1. Check environment variables
+        env_key = f"MIGRATION_{key}"
+        if env_key in os.environ:
+            return self._convert_env_value(os.environ[env_key], type(default_value))
+        for legacy_key in _LEGACY_ENV_KEYS.get(key, ()):
+            if legacy_key in os.environ:
+                frappe.logger('migration').warning(f"{legacy_key} is deprecated, use {env_key} instead")
+                return self._convert_env_value(os.environ[legacy_key], type(default_value))
         
-        for key, default_value in self.DEFAULTS.items():
-            value = default_value
-            
-            # 1. Check environment variables
-            env_key = f"MIGRATION_{key}"
-            if env_key in os.environ:
-                value = self._convert_env_value(os.environ[env_key], type(default_value))
-            
-            # 2. Check site config
-            elif hasattr(frappe, 'conf') and frappe.conf:
-                site_key = f"migration_{key.lower()}"
-                if site_key in frappe.conf:
-                    value = frappe.conf[site_key]
-            
-            # 3. Check Migration Settings DocType
-            else:
-                try:
-                    settings = frappe.get_single('Migration Settings')
-                    settings_key = key.lower()
-                    if hasattr(settings, settings_key) and getattr(settings, settings_key) is not None:
-                        value = getattr(settings, settings_key)
-                except Exception:
-                    pass  # Use default if settings not available
-            
-            self._config_cache[key] = value
+        # 2. Check site config
+        conf = getattr(frappe, 'conf', None)
+        if conf:
+            site_key = f"migration_{key.lower()}"
+            if site_key in conf:
+                return conf[site_key]
+        
+        # 3. Check Migration Settings DocType
+        settings = self._get_settings()
+        if settings is not None:
+            value = getattr(settings, key.lower(), None)
+            if value is not None:
+                return value
+        
+        return default_value
     
     def _convert_env_value(self, env_value: str, target_type: type) -> Any:
         """Convert environment variable string to appropriate type"""
         try:
-            if target_type == bool:
-                return env_value.lower() in ('true', '1', 'yes', 'on')
-            elif target_type == int:
-                return int(env_value)
-            elif target_type == float:
-                return float(env_value)
-            elif target_type == list:
-                # Assume comma-separated values
-                return [item.strip() for item in env_value.split(',') if item.strip()]
-            else:
-                return env_value
+            return _ENV_CONVERTERS.get(target_type, _identity)(env_value)
         except (ValueError, TypeError):
             return self.DEFAULTS.get(env_value, env_value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key"""
-        return self._config_cache.get(key, default or self.DEFAULTS.get(key))
+        try:
+            return self._config_cache[key]
+        except KeyError:
+            pass
+        
+        # Known keys are resolved on first access; unknown keys fall back to the caller's default
+        if key in self.DEFAULTS:
+            value = self._config_cache[key] = self._resolve(key)
+            return value
+        return default
     
     def set(self, key: str, value: Any):
         """Set configuration value (runtime only)"""
         self._config_cache[key] = value
+        if key in _HOT_KEYS:
+            self._hot = None
+        for name, keys in _LIMIT_BUNDLES.items():
+            if key in keys.values():
+                self._limit_bundles.pop(name, None)
+    
+    def _get_bundle(self, name: str) -> MappingProxyType:
+        """Build a named limits bundle once and return a read-only view of it"""
+        bundle = self._limit_bundles.get(name)
+        if bundle is None:
+            bundle = self._limit_bundles[name] = MappingProxyType(
+                {field: self.get(key) for field, key in _LIMIT_BUNDLES[name].items()}
+            )
+        return bundle
     
     def get_file_limits(self) -> Dict[str, Any]:
         """Get file processing limits"""
-        return {
-            'max_size_mb': self.get('MAX_FILE_SIZE_MB'),
-            'chunk_size': self.get('CHUNK_SIZE'),
-            'supported_extensions': self.get('SUPPORTED_EXTENSIONS'),
-            'max_filename_length': self.get('MAX_FILENAME_LENGTH')
-        }
+        return self._get_bundle('file')
     
     def get_performance_limits(self) -> Dict[str, Any]:
         """Get performance and resource limits"""
-        return {
-            'max_memory_mb': self.get('MAX_MEMORY_MB'),
-            'min_available_memory_mb': self.get('MIN_AVAILABLE_MEMORY_MB'),
-            'max_memory_percent': self.get('MAX_MEMORY_PERCENT'),
-            'max_cpu_percent': self.get('MAX_CPU_PERCENT'),
-            'max_operation_time_seconds': self.get('MAX_OPERATION_TIME_SECONDS')
-        }
+        return self._get_bundle('performance')
     
     def get_database_limits(self) -> Dict[str, Any]:
         """Get database operation limits"""
-        return {
-            'max_name_attempts': self.get('MAX_NAME_GENERATION_ATTEMPTS'),
-            'batch_size': self.get('BATCH_SIZE'),
-            'max_retries': self.get('MAX_RETRIES'),
-            'timeout_seconds': self.get('DB_TIMEOUT_SECONDS')
-        }
+        return self._get_bundle('database')
     
     def get_field_type_config(self) -> Dict[str, Any]:
         """Get field type detection configuration"""
-        return {
-            'data_field_max_length': self.get('DATA_FIELD_MAX_LENGTH'),
-            'small_text_max_length': self.get('SMALL_TEXT_MAX_LENGTH'),
-            'medium_text_max_length': self.get('MEDIUM_TEXT_MAX_LENGTH'),
-            'phone_min_length': self.get('PHONE_MIN_LENGTH'),
-            'email_max_length': self.get('EMAIL_MAX_LENGTH')
-        }
+        return self._get_bundle('field_type')
     
     def get_security_config(self) -> Dict[str, Any]:
         """Get security configuration"""
-        return {
-            'allowed_mime_types': self.get('ALLOWED_MIME_TYPES'),
-            'max_path_depth': self.get('MAX_PATH_DEPTH'),
-            'forbidden_path_components': self.get('FORBIDDEN_PATH_COMPONENTS')
-        }
+        return self._get_bundle('security')
     
     def validate_config(self) -> list:
         """Validate current configuration and return list of errors"""
@@ -202,19 +277,27 @@ class MigrationConfig:
     
     def get_environment_summary(self) -> Dict[str, Any]:
         """Get summary of current environment configuration"""
+        # MIGRATION_* variables are scanned once per config load
+        if self._env_vars is None:
+            self._env_vars = MappingProxyType({k: v for k, v in os.environ.items() if k.startswith('MIGRATION_')})
+        
+        # Resolve any keys not read yet, then expose the cache as a read-only view
+        for key in self.DEFAULTS:
+            if key not in self._config_cache:
+                self.get(key)
+        
         return {
             'config_source': {
-                'environment_vars': {k: v for k, v in os.environ.items() if k.startswith('MIGRATION_')},
+                'environment_vars': self._env_vars,
                 'site_config_keys': [k for k in (frappe.conf or {}).keys() if k.startswith('migration_')],
                 'defaults_used': list(self.DEFAULTS.keys())
             },
-            'current_values': dict(self._config_cache),
+            'current_values': MappingProxyType(self._config_cache),
             'validation_errors': self.validate_config()
         }
     
     def reload(self):
         """Reload configuration from all sources"""
-        self._config_cache.clear()
         self._load_config()
 
 
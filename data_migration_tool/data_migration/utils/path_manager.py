@@ -1,9 +1,23 @@
 import os
 import re
 import frappe
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+# Characters replaced by '_' in sanitized filenames: <>:"/\|?* and control chars
+_FILENAME_BAD_CHARS = '<>:"/\\|?*' + ''.join(chr(c) for c in range(0x20))
+_FILENAME_TRANSLATE = str.maketrans({ch: '_' for ch in _FILENAME_BAD_CHARS})
+
+# System directories (and anything below them) that may never be used for migration files
+_SYSTEM_DIRS = ('/etc', '/usr', '/var', '/sys', '/proc', '/dev', '/boot')
+_SYSTEM_DIR_PREFIXES = tuple(sys_dir + '/' for sys_dir in _SYSTEM_DIRS)
+
+@lru_cache(maxsize=8)
+def _site_migration_directory(site: str) -> str:
+    """Resolve the migration base directory for a site"""
+    return frappe.get_site_path('private', 'files', 'migration')
+
 class SecurePathManager:
     """Manages secure file paths and prevents path traversal attacks"""
     
@@ -11,21 +25,20 @@ class SecurePathManager:
     def get_migration_base_directory() -> str:
         """Get secure base directory for migration files"""
         # Use site-specific private directory
-        return frappe.get_site_path('private', 'files', 'migration')
+        return _site_migration_directory(frappe.local.site)
     
     @staticmethod
     def get_watch_directory() -> str:
         """Get CSV watch directory with fallback"""
         try:
-            settings = frappe.get_single('Migration Settings')
-            custom_dir = getattr(settings, 'csv_watch_directory', None)
+            custom_dir = frappe.db.get_single_value('Migration Settings', 'csv_watch_directory', cache=True)
             
             if custom_dir and os.path.isabs(custom_dir):
                 # Validate custom directory
                 if SecurePathManager.validate_directory_security(custom_dir):
                     return custom_dir
                 else:
-                    frappe.log_error(f"Custom directory {custom_dir} failed security validation")
+                    frappe.logger('migration').warning(f"Custom directory {custom_dir} failed security validation")
             
         except Exception as e:
             frappe.log_error(f"Error getting custom watch directory: {str(e)}")
@@ -45,7 +58,7 @@ class SecurePathManager:
         filename = os.path.basename(filename)
         
         # Remove dangerous characters
-        filename = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', filename)
+        filename = filename.translate(_FILENAME_TRANSLATE)
         
         # Ensure not empty after sanitization
         if not filename.strip():
@@ -62,20 +75,20 @@ class SecurePathManager:
     def validate_directory_security(directory: str) -> bool:
         """Validate directory is secure for use"""
         try:
-            # Check it's not a system directory
-            system_dirs = ['/etc', '/usr', '/var', '/sys', '/proc', '/dev', '/boot']
-            abs_path = os.path.abspath(directory)
-            
-            for sys_dir in system_dirs:
-                if abs_path.startswith(sys_dir):
-                    return False
+            # Check it's not a system directory; resolved on every call so a swapped symlink is seen
+            abs_path = os.path.realpath(directory)
+            if abs_path in _SYSTEM_DIRS or abs_path.startswith(_SYSTEM_DIR_PREFIXES):
+                return False
             
             # Check permissions
-            if os.path.exists(directory):
+            try:
                 stat_info = os.stat(directory)
-                # Check it's not world-writable (security risk)
-                if stat_info.st_mode & 0o002:
-                    return False
+            except FileNotFoundError:
+                return True
+            
+            # Check it's not world-writable (security risk)
+            if stat_info.st_mode & 0o002:
+                return False
             
             return True
             
@@ -108,14 +121,31 @@ class SecurePathManager:
             'backup': os.path.join(base_dir, 'backup')
         }
         
+        # One scandir of the base tells us which sub-directories already exist
+        try:
+            with os.scandir(base_dir) as entries:
+                existing = {entry.name for entry in entries if entry.is_dir() or entry.name == '.gitkeep'}
+        except FileNotFoundError:
+            existing = None
+        
         for name, path in directories.items():
             try:
-                os.makedirs(path, mode=0o755, exist_ok=True)
-                # Create .gitkeep file
-                gitkeep_path = os.path.join(path, '.gitkeep')
-                if not os.path.exists(gitkeep_path):
-                    with open(gitkeep_path, 'w') as f:
-                        f.write(f"# Keep {name} directory in git\n")
+                if name == 'base':
+                    if existing is None:
+                        os.makedirs(path, mode=0o755, exist_ok=True)
+                    has_gitkeep = existing is not None and '.gitkeep' in existing
+                else:
+                    if existing is None or name not in existing:
+                        os.makedirs(path, mode=0o755, exist_ok=True)
+                    has_gitkeep = False
+                
+                # Create .gitkeep file; exclusive mode skips a separate exists() check
+                if not has_gitkeep:
+                    try:
+                        with open(os.path.join(path, '.gitkeep'), 'x') as f:
+                            f.write(f"# Keep {name} directory in git\n")
+                    except FileExistsError:
+                        pass
             except Exception as e:
                 frappe.log_error(f"Failed to create directory {path}: {str(e)}")
         
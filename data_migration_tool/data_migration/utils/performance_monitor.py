@@ -2,37 +2,53 @@ import frappe
 import time
 from contextlib import contextmanager
 from typing import Dict, Any, Optional
-import psutil
 import os
+from data_migration_tool.data_migration.utils.resource_manager import (
+    get_psutil, get_system_sampler, get_current_process, _BYTES_PER_MB
+)
+from data_migration_tool.data_migration.utils.migration_config import migration_config
+
+# How long a healthy resource check may be reused
+_STATUS_REUSE_SECONDS = 2.0
 
 class PerformanceMonitor:
     def __init__(self, logger):
         self.logger = logger
         self.metrics = {}
-        # Resource limits - configurable via environment variables
-        self.min_memory_mb = int(os.environ.get('MIGRATION_MIN_MEMORY_MB', '100'))
-        self.max_memory_percent = int(os.environ.get('MIGRATION_MAX_MEMORY_PERCENT', '85'))
-        self.max_cpu_percent = int(os.environ.get('MIGRATION_MAX_CPU_PERCENT', '90'))
-        self.max_operation_time = int(os.environ.get('MIGRATION_MAX_OPERATION_TIME', '3600'))
+        # Resource limits - resolved once per process by the shared migration config
+        self.min_memory_mb = int(migration_config.get('MIN_AVAILABLE_MEMORY_MB'))
+        self.max_memory_percent = int(migration_config.HOT.max_memory_percent)
+        self.max_cpu_percent = int(migration_config.HOT.max_cpu_percent)
+        self.max_operation_time = int(migration_config.get('MAX_OPERATION_TIME_SECONDS'))
+        self.max_file_size_mb = int(migration_config.get('MAX_FILE_SIZE_MB'))
+        self._max_file_size_bytes = self.max_file_size_mb * _BYTES_PER_MB
+        self._deadline = None
+        self._last_status = None
+        self._last_status_ts = 0.0
+        
+        get_system_sampler().prime()
+        self._proc = get_current_process()
     
     def check_resource_availability(self, required_memory_mb: Optional[int] = None) -> Dict[str, Any]:
         """Check if system has sufficient resources for operation"""
-        memory = psutil.virtual_memory()
-        cpu_percent = psutil.cpu_percent(interval=1)
-        disk = psutil.disk_usage('/')
+        # A healthy result from the last couple of seconds is still good for a default check
+        if (required_memory_mb is None and self._last_status is not None
+                and self._last_status['system_healthy']
+                and time.monotonic() - self._last_status_ts < _STATUS_REUSE_SECONDS):
+            return dict(self._last_status)
         
-        available_memory_mb = memory.available / 1024 / 1024
+        sample = get_system_sampler().sample()
         required_mb = required_memory_mb or self.min_memory_mb
         
         status = {
-            'available_memory_mb': available_memory_mb,
+            'available_memory_mb': sample.mem_available_mb,
             'required_memory_mb': required_mb,
-            'memory_percent': memory.percent,
-            'cpu_percent': cpu_percent,
-            'disk_free_gb': disk.free / 1024 / 1024 / 1024,
-            'has_sufficient_memory': available_memory_mb >= required_mb,
-            'memory_usage_ok': memory.percent <= self.max_memory_percent,
-            'cpu_usage_ok': cpu_percent <= self.max_cpu_percent,
+            'memory_percent': sample.mem_percent,
+            'cpu_percent': sample.cpu_percent,
+            'disk_free_gb': sample.disk_free_gb,
+            'has_sufficient_memory': sample.mem_available_mb >= required_mb,
+            'memory_usage_ok': sample.mem_percent <= self.max_memory_percent,
+            'cpu_usage_ok': sample.cpu_percent <= self.max_cpu_percent,
             'system_healthy': True
         }
         
@@ -43,13 +59,20 @@ class PerformanceMonitor:
             status['cpu_usage_ok']
         )
         
+        if required_memory_mb is None:
+            self._last_status = status
+            self._last_status_ts = time.monotonic()
+            return dict(status)
+        
         return status
     
+    def is_expired(self) -> bool:
+        """Check whether the current operation has run past its time limit"""
+        return self._deadline is not None and time.monotonic() > self._deadline
+    
     @contextmanager
     def measure_operation(self, operation_name: str, required_memory_mb: Optional[int] = None):
         """Enhanced context manager with resource validation and timeout"""
-        import threading
-        
         # Pre-flight resource check
         resource_status = self.check_resource_availability(required_memory_mb)
         
@@ -59,17 +82,11 @@ class PerformanceMonitor:
             raise RuntimeError(error_msg)
         
         start_time = time.time()
-        start_memory = psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024  # MB
+        start_memory = self._proc.memory_info().rss / _BYTES_PER_MB  # MB
         
-        # Setup operation timeout
-        timeout_occurred = threading.Event()
-        
-        def timeout_handler():
-            timeout_occurred.set()
-            self.logger.logger.error(f"⏰ Operation '{operation_name}' timed out after {self.max_operation_time} seconds")
-        
-        timer = threading.Timer(self.max_operation_time, timeout_handler)
-        timer.start()
+        # Setup operation timeout - checked cooperatively via is_expired()
+        previous_deadline = self._deadline
+        self._deadline = time.monotonic() + self.max_operation_time
         
         try:
             self.logger.logger.info(f"🚀 Starting operation: {operation_name}", extra={
@@ -80,14 +97,15 @@ class PerformanceMonitor:
             yield
             
             # Check if timeout occurred during operation
-            if timeout_occurred.is_set():
+            if self.is_expired():
+                self.logger.logger.error(f"⏰ Operation '{operation_name}' timed out after {self.max_operation_time} seconds")
                 raise TimeoutError(f"Operation '{operation_name}' exceeded maximum time limit")
                 
         finally:
-            timer.cancel()
+            self._deadline = previous_deadline
             
             end_time = time.time()
-            end_memory = psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024  # MB
+            end_memory = self._proc.memory_info().rss / _BYTES_PER_MB  # MB
             
             duration = end_time - start_time
             memory_delta = end_memory - start_memory
@@ -115,18 +133,16 @@ class PerformanceMonitor:
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get comprehensive system metrics"""
         try:
-            memory = psutil.virtual_memory()
-            cpu_percent = psutil.cpu_percent()
-            disk = psutil.disk_usage('/')
+            sample = get_system_sampler().sample()
             
             return {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'memory_available_mb': memory.available / 1024 / 1024,
-                'memory_total_gb': memory.total / 1024 / 1024 / 1024,
-                'disk_usage_percent': (disk.used / disk.total) * 100,
-                'disk_free_gb': disk.free / 1024 / 1024 / 1024,
-                'process_count': len(psutil.pids()),
+                'cpu_percent': sample.cpu_percent,
+                'memory_percent': sample.mem_percent,
+                'memory_available_mb': sample.mem_available_mb,
+                'memory_total_gb': sample.mem_total_gb,
+                'disk_usage_percent': sample.disk_percent,
+                'disk_free_gb': sample.disk_free_gb,
+                'process_count': len(get_psutil().pids()),
                 'load_average': os.getloadavg() if hasattr(os, 'getloadavg') else 'N/A'
             }
         except Exception as e:
@@ -160,14 +176,20 @@ class PerformanceMonitor:
     def validate_file_size(self, file_path: str, max_size_mb: Optional[int] = None) -> bool:
         """Validate file size against limits"""
         try:
-            if not os.path.exists(file_path):
+            try:
+                file_size = os.stat(file_path).st_size
+            except FileNotFoundError:
                 self.logger.logger.error(f"File not found: {file_path}")
                 return False
             
-            file_size_mb = os.path.getsize(file_path) / 1024 / 1024
-            max_allowed = max_size_mb or int(os.environ.get('MIGRATION_MAX_FILE_MB', '100'))
+            if max_size_mb:
+                max_allowed, max_allowed_bytes = max_size_mb, max_size_mb * _BYTES_PER_MB
+            else:
+                max_allowed, max_allowed_bytes = self.max_file_size_mb, self._max_file_size_bytes
             
-            if file_size_mb > max_allowed:
+            # Integer byte comparison; MB is only computed for the error message
+            if file_size > max_allowed_bytes:
+                file_size_mb = file_size / _BYTES_PER_MB
                 self.logger.logger.error(f"File too large: {file_path} ({file_size_mb:.1f}MB > {max_allowed}MB)")
                 return False
             
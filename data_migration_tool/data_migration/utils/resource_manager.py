@@ -1,73 +1,148 @@
 import os
-import psutil
 import time
 import threading
+import frappe
 from contextlib import contextmanager
+from collections import namedtuple
 from typing import Optional, Dict, Any
+from data_migration_tool.data_migration.utils.migration_config import migration_config
+
+# Byte conversion factors
+_BYTES_PER_MB = 1 << 20
+_BYTES_PER_GB = 1 << 30
+
+# psutil is imported on first use so idle workers don't pay for it
+_psutil = None
+
+def get_psutil():
+    """Import psutil lazily and cache the module"""
+    global _psutil
+    if _psutil is None:
+        import psutil
+        _psutil = psutil
+    return _psutil
+
+# Handle for the current process, recreated if the worker forks
+_process = None
+
+def get_current_process():
+    """Return a cached psutil.Process for this process"""
+    global _process
+    if _process is None or _process.pid != os.getpid():
+        _process = get_psutil().Process()
+    return _process
+
+# One reading of system memory, CPU and disk usage
+SystemSample = namedtuple('SystemSample', [
+    'mem_available_mb', 'mem_percent', 'mem_total_gb', 'cpu_percent', 'disk_free_gb', 'disk_percent'
+])
+
+# Short-lived samples are shared by all resource checks
+_SNAPSHOT_TTL_SECONDS = 1.5
+
+class _SystemSampler:
+    """Process-wide sampler of system resources, refreshed at most once per TTL"""
+    
+    def __init__(self, ttl: float = _SNAPSHOT_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sample = None
+        self._taken_at = 0.0
+        self._primed = False
+    
+    def prime(self):
+        """Start psutil's CPU counters so the first non-blocking sample is meaningful"""
+        if not self._primed:
+            get_psutil().cpu_percent(interval=None)
+            self._primed = True
+    
+    def sample(self, ttl: Optional[float] = None) -> SystemSample:
+        """Return the current sample, re-reading psutil if it is older than ttl"""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            if self._sample is None or now - self._taken_at >= ttl:
+                psutil = get_psutil()
+                memory = psutil.virtual_memory()
+                disk = psutil.disk_usage('/')
+                self._sample = SystemSample(
+                    mem_available_mb=memory.available / _BYTES_PER_MB,
+                    mem_percent=memory.percent,
+                    mem_total_gb=memory.total / _BYTES_PER_GB,
+                    # Non-blocking: usage since the previous call instead of sleeping a full second
+                    cpu_percent=psutil.cpu_percent(interval=None),
+                    disk_free_gb=disk.free / _BYTES_PER_GB,
+                    disk_percent=(disk.used / disk.total) * 100
+                )
+                self._primed = True
+                self._taken_at = now
+            return self._sample
+
+_system_sampler = _SystemSampler()
+
+def get_system_sampler() -> _SystemSampler:
+    """Get the shared system sampler"""
+    return _system_sampler
 
 class ResourceManager:
     """Manages system resources and prevents resource exhaustion"""
     
     def __init__(self):
-        self.max_memory_mb = int(os.environ.get('MIGRATION_MAX_MEMORY_MB', '512'))
-        self.max_file_size_mb = int(os.environ.get('MIGRATION_MAX_FILE_MB', '100'))
-        self.max_operation_time = int(os.environ.get('MIGRATION_MAX_TIME_SECONDS', '3600'))
+        # Limits come from the shared migration config (env > site config > settings > defaults)
+        self.max_memory_mb = int(migration_config.get('MAX_MEMORY_MB'))
+        self.max_file_size_mb = int(migration_config.get('MAX_FILE_SIZE_MB'))
+        self.max_operation_time = int(migration_config.get('MAX_OPERATION_TIME_SECONDS'))
+        self._deadline = None
+        
+        _system_sampler.prime()
+        self._proc = get_current_process()
     
     def check_system_resources(self) -> Dict[str, Any]:
         """Check current system resource availability"""
         try:
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            cpu = psutil.cpu_percent(interval=1)
+            sample = _system_sampler.sample()
             
             return {
-                'memory_available_mb': memory.available / 1024 / 1024,
-                'memory_percent': memory.percent,
-                'disk_free_gb': disk.free / 1024 / 1024 / 1024,
-                'disk_percent': (disk.used / disk.total) * 100,
-                'cpu_percent': cpu,
+                'memory_available_mb': sample.mem_available_mb,
+                'memory_percent': sample.mem_percent,
+                'disk_free_gb': sample.disk_free_gb,
+                'disk_percent': sample.disk_percent,
+                'cpu_percent': sample.cpu_percent,
                 'healthy': (
-                    memory.percent < 85 and 
-                    (disk.used / disk.total) * 100 < 90 and 
-                    cpu < 90
+                    sample.mem_percent < 85 and 
+                    sample.disk_percent < 90 and 
+                    sample.cpu_percent < 90
                 )
             }
         except Exception as e:
-            import frappe
             frappe.log_error(f"Failed to check system resources: {str(e)}")
             return {'healthy': False, 'error': str(e)}
     
     def validate_file_size(self, file_path: str) -> bool:
         """Validate file size is within limits"""
         try:
-            size_mb = os.path.getsize(file_path) / 1024 / 1024
+            size_mb = os.path.getsize(file_path) / _BYTES_PER_MB
             if size_mb > self.max_file_size_mb:
-                import frappe
-                frappe.log_error(f"File {file_path} ({size_mb:.1f}MB) exceeds limit ({self.max_file_size_mb}MB)")
+                frappe.logger('migration').warning(f"File {file_path} ({size_mb:.1f}MB) exceeds limit ({self.max_file_size_mb}MB)")
                 return False
             return True
         except Exception as e:
-            import frappe
             frappe.log_error(f"Failed to check file size for {file_path}: {str(e)}")
             return False
     
+    def is_expired(self) -> bool:
+        """Check whether the monitored operation has run past its time limit"""
+        return self._deadline is not None and time.monotonic() > self._deadline
+    
     @contextmanager
     def resource_monitor(self, operation_name: str):
         """Monitor resource usage during operation"""
-        import frappe
-        
         start_time = time.time()
-        start_memory = psutil.Process().memory_info().rss / 1024 / 1024
-        
-        # Setup timeout
-        timeout_occurred = threading.Event()
-        
-        def timeout_handler():
-            timeout_occurred.set()
-            frappe.log_error(f"Operation '{operation_name}' timed out after {self.max_operation_time} seconds")
+        start_memory = self._proc.memory_info().rss / _BYTES_PER_MB
         
-        timer = threading.Timer(self.max_operation_time, timeout_handler)
-        timer.start()
+        # Setup timeout - checked cooperatively via is_expired()
+        previous_deadline = self._deadline
+        self._deadline = time.monotonic() + self.max_operation_time
         
         try:
             # Check initial resources
@@ -77,15 +152,16 @@ class ResourceManager:
             
             yield
             
-            if timeout_occurred.is_set():
+            if self.is_expired():
+                frappe.log_error(f"Operation '{operation_name}' timed out after {self.max_operation_time} seconds")
                 raise TimeoutError(f"Operation '{operation_name}' exceeded maximum time limit")
                 
         finally:
-            timer.cancel()
+            self._deadline = previous_deadline
             
             # Log final metrics
             end_time = time.time()
-            end_memory = psutil.Process().memory_info().rss / 1024 / 1024
+            end_memory = self._proc.memory_info().rss / _BYTES_PER_MB
             duration = end_time - start_time
             memory_delta = end_memory - start_memory
             
@@ -98,18 +174,17 @@ class ResourceManager:
     def check_available_memory(self, required_mb: int) -> bool:
         """Check if enough memory is available for operation"""
         try:
-            available_mb = psutil.virtual_memory().available / 1024 / 1024
-            return available_mb >= required_mb
+            return _system_sampler.sample().mem_available_mb >= required_mb
         except Exception:
             return False
     
     def get_optimal_batch_size(self, record_size_bytes: int = 1024) -> int:
         """Calculate optimal batch size based on available memory"""
         try:
-            available_mb = psutil.virtual_memory().available / 1024 / 1024
+            available_mb = _system_sampler.sample().mem_available_mb
             # Use 10% of available memory for batching
             usable_mb = available_mb * 0.1
-            usable_bytes = usable_mb * 1024 * 1024
+            usable_bytes = usable_mb * _BYTES_PER_MB
             
             batch_size = int(usable_bytes / record_size_bytes)
             
@@ -119,4 +194,4 @@ class ResourceManager:
             
             return max(min_batch, min(batch_size, max_batch))
         except Exception:
-            return 1000  # Safe default
\ No newline at end of file
+            return 1000  # Safe default
@@ -1,12 +1,20 @@
 # Scheduler tasks for data migration - Enhanced Phase 1 Version with User Approval Fix
+import errno
 import os
 import shutil
+import threading
+import time
 import frappe
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from frappe.utils import now, add_to_date, get_datetime
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, Optional
 import hashlib
 import json
+import math
 from datetime import datetime
 import numpy as np
 import pandas as pd
@@ -14,6 +22,29 @@ import re
 
 from data_migration_tool.data_migration_tool.doctype.csv_schema_registry.csv_schema_registry import get_field_mappings_from_registry
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+FAST_FINGERPRINT_AVAILABLE = ORJSON_AVAILABLE and XXHASH_AVAILABLE
+
+# Version 1 is the legacy MD5 digest; version 2 is an xxh3 digest prefixed with "v2:"
+FINGERPRINT_VERSION = 2 if FAST_FINGERPRINT_AVAILABLE else 1
+
 # Add after existing imports:
 try:
     from data_migration_tool.data_migration.connectors.csv_connector import CSVConnector
@@ -23,40 +54,218 @@ except ImportError as e:
     CSV_CONNECTOR_AVAILABLE = False
 
 
+# Value patterns for IntelligentSchemaDetector, compiled once per process
+_CURRENCY_PATTERNS = tuple(re.compile(p) for p in (
+    r'^\$?[\d,]+\.?\d{0,2}$',
+    r'^INR\s*[\d,]+\.?\d{0,2}$',
+    r'^[\d,]+\.?\d{0,2}\s*(USD|EUR|GBP|INR)$'
+))
+_ID_PATTERNS = tuple(re.compile(p) for p in (
+    r'^[A-Z]{2,4}-\d{4,}$',
+    r'^\d{8,}$',
+    r'^[A-Z]+\d+$'
+))
+_DATE_PATTERNS = tuple(re.compile(p) for p in (
+    r'\d{4}-\d{2}-\d{2}',
+    r'\d{2}/\d{2}/\d{4}',
+    r'\d{2}-\d{2}-\d{4}'
+))
+_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_PATTERN = re.compile(r'^[\+]?[1-9][\d\s\-\(\)]{7,15}$')
+
+_TYPE_PATTERNS = (
+    ('Currency', _CURRENCY_PATTERNS),
+    ('ID', _ID_PATTERNS),
+    ('Date', _DATE_PATTERNS),
+    ('Email', (_EMAIL_PATTERN,)),
+    ('Phone', (_PHONE_PATTERN,))
+)
+
+def _as_str_series(series: pd.Series) -> pd.Series:
+    """Series as strings, skipping the conversion copy when it already holds text"""
+    if series.dtype == object:
+        if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            return series
+        # Mixed object columns: .str would turn the non-str values into NaN scores
+        return series.astype(object).fillna('').astype(str)
+    if pd.api.types.is_string_dtype(series.dtype):
+        return series
+    # Numbers, dates and categoricals (including the enum-like columns profiled as category)
+    return series.astype(str)
+
+def _count_numeric(values: pd.Series) -> int:
+    """Count string values that parse as numbers once thousands separators are removed"""
+    # Coercion marks non-numeric values as NaN instead of raising per value
+    return int(pd.to_numeric(values.str.replace(',', '', regex=False), errors='coerce').notna().sum())
+
+# Types conclusive enough to accept from the first few values alone
+_FASTPATH_PATTERNS = (
+    ('Email', (_EMAIL_PATTERN,)),
+    ('Date', _DATE_PATTERNS),
+    ('Currency', _CURRENCY_PATTERNS)
+)
+
+class _KeywordMatcher:
+    """Finds the highest-priority keyword contained in a string in a single scan"""
+    
+    def __init__(self, entries):
+        # entries: (keyword, value) pairs in priority order; the first listing of a keyword wins
+        self._entries = {}
+        for priority, (keyword, value) in enumerate(entries):
+            self._entries.setdefault(keyword, (priority, value))
+        
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, entry in self._entries.items():
+                self._automaton.add_word(keyword, entry)
+            self._automaton.make_automaton()
+        
+        # Lookahead alternation reports overlapping matches, like repeated `in` checks did
+        alternation = '|'.join(re.escape(kw) for kw in sorted(self._entries, key=len, reverse=True))
+        self._regex = re.compile(f'(?=({alternation}))')
+    
+    def first(self, text: str, default=None):
+        """Return the value of the highest-priority keyword found in text"""
+        if self._automaton is not None:
+            matches = [entry for _end, entry in self._automaton.iter(text)]
+        else:
+            matches = [self._entries[m.group(1)] for m in self._regex.finditer(text)]
+        return min(matches)[1] if matches else default
+
+# Business context keywords, checked in order
+_BUSINESS_CONTEXT_MATCHER = _KeywordMatcher(
+    (keyword, context)
+    for context, keywords in (
+        ('Customer', ('customer', 'client', 'buyer')),
+        ('Supplier', ('vendor', 'supplier', 'seller')),
+        ('Item', ('product', 'item', 'inventory')),
+        ('Address', ('address', 'location', 'city', 'state')),
+        ('Accounting', ('invoice', 'bill', 'payment'))
+    )
+    for keyword in keywords
+)
+
+# Filename keyword -> DocType hints, checked in order
+_FILENAME_DOCTYPE_MATCHER = _KeywordMatcher((
+    ('customer', 'Customer'),
+    ('supplier', 'Supplier'),
+    ('vendor', 'Supplier'),
+    ('item', 'Item'),
+    ('product', 'Item'),
+    ('invoice', 'Sales Invoice'),
+    ('payment', 'Payment Entry')
+))
+
+# Common source keyword -> target fieldname mappings, checked in order
+_SEMANTIC_MATCHER = _KeywordMatcher((
+    ('customer', 'customer_name'),
+    ('supplier', 'supplier_name'),
+    ('vendor', 'supplier_name'),
+    ('item', 'item_name'),
+    ('product', 'item_name'),
+    ('email', 'email_id'),
+    ('phone', 'mobile_no'),
+    ('mobile', 'mobile_no'),
+    ('address', 'address_line1'),
+    ('city', 'city'),
+    ('state', 'state'),
+    ('country', 'country'),
+    ('total', 'grand_total'),
+    ('amount', 'amount'),
+    ('quantity', 'qty'),
+    ('rate', 'rate'),
+    ('date', 'date')
+))
+
+# Fieldnames treated as merge identifiers even when not marked unique
+_IDENTIFIER_FIELDNAMES = frozenset(['name', 'id', 'code', 'email'])
+
+def _meta_version(doctype: str) -> str:
+    """Schema version of a DocType, read from the database so every process sees the same value
+
+    Combines the DocType's modified timestamp with the count and latest change of its custom fields.
+    """
+    row = frappe.db.sql("""
+        SELECT dt.modified, COUNT(cf.name), MAX(cf.modified)
+        FROM `tabDocType` dt
+        LEFT JOIN `tabCustom Field` cf ON cf.dt = dt.name
+        WHERE dt.name = %s
+        GROUP BY dt.name, dt.modified
+    """, (doctype,))
+    return '|'.join(str(value) for value in row[0]) if row else ''
+
+@lru_cache(maxsize=64)
+def _doctype_field_index(site: str, doctype: str, meta_version: str) -> Tuple[tuple, frozenset, dict]:
+    """Build the field index for a DocType on a site at a schema version"""
+    fields = frappe.get_meta(doctype).fields
+    unique_fields = tuple(f.fieldname for f in fields if f.unique or f.fieldname in _IDENTIFIER_FIELDNAMES)
+    field_by_name = {f.fieldname: f for f in fields}
+    return unique_fields, frozenset(field_by_name), field_by_name
+
+def _get_doctype_field_index(doctype: str) -> Tuple[tuple, frozenset, dict]:
+    """Return (unique_fields, fieldnames, field_by_name) for a DocType, cached per site and schema version"""
+    return _doctype_field_index(frappe.local.site, doctype, _meta_version(doctype))
+
+def clear_doctype_field_index():
+    """Drop this process's cached field indexes, e.g. after it created a DocType
+
+    Other processes need no signal: a changed DocType gets a new schema version and misses their cache.
+    """
+    _doctype_field_index.cache_clear()
+
+@lru_cache(maxsize=8)
+def _load_patterns(site: str) -> dict:
+    """Load learned field patterns for a site, keyed by schema fingerprint"""
+    patterns = frappe.get_all("CSV Schema Registry", 
+        fields=["headers_json", "target_doctype", "schema_fingerprint"])
+    return {p.schema_fingerprint: p for p in patterns}
+
+def get_learned_patterns() -> dict:
+    """Learned field patterns from the schema registry, loaded once per process"""
+    try:
+        return _load_patterns(frappe.local.site)
+    except Exception:
+        return {}
+
+def invalidate_learned_patterns():
+    """Drop cached patterns after the schema registry is written"""
+    _load_patterns.cache_clear()
+
 # Add this to scheduler_tasks.py after existing imports
 class IntelligentSchemaDetector:
     """AI-powered schema detection and field mapping"""
     
     def __init__(self):
-        self.field_patterns = self._load_learned_patterns()
+        self.field_patterns = get_learned_patterns()
         self.confidence_threshold = 0.75
+        # Rows inspected for type inference, and values checked by the fast path
+        self.sample_cap = 1000
+        self.fastpath_head = 10
+        # Frames at least this wide are profiled on a thread pool
+        self.parallel_min_columns = 32
         
-    def _load_learned_patterns(self):
-        """Load learned field patterns from database"""
-        try:
-            patterns = frappe.get_all("CSV Schema Registry", 
-                fields=["headers_json", "target_doctype", "schema_fingerprint"])
-            return {p.schema_fingerprint: p for p in patterns}
-        except:
-            return {}
-    
     def analyze_csv_structure_advanced(self, df: pd.DataFrame, filename: str) -> Dict[str, Any]:
         """Enhanced analysis with pattern recognition"""
-        column_profiles = {}
-        
-        for col in df.columns:
-            sample_values = df[col].dropna().astype(str).head(100).tolist()
-            
-            column_profiles[col] = {
-                'original_name': col,
-                'clean_name': self._clean_field_name(col),
-                'suggested_type': self._detect_data_type_advanced(df[col]),
-                'sample_values': sample_values[:5],
-                'null_count': df[col].isna().sum(),
-                'unique_count': df[col].nunique(),
-                'max_length': max([len(str(v)) for v in sample_values]) if sample_values else 0,
-                'business_context': self._detect_business_context(col, sample_values)
-            }
+        # Enum-like string columns are profiled as categoricals; the caller's frame is untouched
+        df = self._categorize_low_cardinality(df)
+        
+        # Whole-frame counts in one vectorized pass each
+        null_counts = df.isna().sum()
+        unique_counts = df.nunique(dropna=True)
+        
+        # Columns are independent; wide frames are profiled on a thread pool
+        columns = list(df.columns)
+        if len(columns) >= self.parallel_min_columns:
+            workers = min(8, os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                profiles = list(executor.map(
+                    lambda col: self._profile_column(col, df[col], null_counts[col], unique_counts[col]),
+                    columns
+                ))
+        else:
+            profiles = [self._profile_column(col, df[col], null_counts[col], unique_counts[col]) for col in columns]
+        column_profiles = dict(zip(columns, profiles, strict=True))
         
         # Predict DocType using ensemble methods
         doctype_prediction = self._predict_doctype_ensemble(column_profiles, filename)
@@ -69,62 +278,66 @@ class IntelligentSchemaDetector:
             'field_mappings': self._generate_intelligent_mappings(column_profiles, doctype_prediction['name'])
         }
     
-    def _detect_data_type_advanced(self, series: pd.Series) -> Dict[str, Any]:
-        """Advanced data type detection with confidence scoring"""
-        sample_values = series.dropna().astype(str).head(50).tolist()
-        type_scores = {}
+    def _profile_column(self, col: str, series: pd.Series, null_count: int, unique_count: int) -> Dict[str, Any]:
+        """Build the profile for a single column"""
+        sample = _as_str_series(series.dropna().head(100))
         
-        # Currency patterns
-        currency_patterns = [
-            r'^\$?[\d,]+\.?\d{0,2}$',
-            r'^INR\s*[\d,]+\.?\d{0,2}$',
-            r'^[\d,]+\.?\d{0,2}\s*(USD|EUR|GBP|INR)$'
-        ]
-        
-        # ID patterns
-        id_patterns = [
-            r'^[A-Z]{2,4}-\d{4,}$',
-            r'^\d{8,}$',
-            r'^[A-Z]+\d+$'
-        ]
-        
-        # Date patterns
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',
-            r'\d{2}/\d{2}/\d{4}',
-            r'\d{2}-\d{2}-\d{4}'
+        return {
+            'original_name': col,
+            'clean_name': self._clean_field_name(col),
+            'suggested_type': self._detect_data_type_advanced(sample),
+            'sample_values': sample.head(5).tolist(),
+            'null_count': null_count,
+            'unique_count': unique_count,
+            'max_length': int(sample.str.len().max()) if len(sample) else 0,
+            'business_context': self._detect_business_context(col, sample)
+        }
+    
+    def _categorize_low_cardinality(self, df: pd.DataFrame, sample_rows: int = 1000,
+                                    max_ratio: float = 0.1) -> pd.DataFrame:
+        """Return a shallow copy with low-cardinality object columns converted to category"""
+        sample = df.head(sample_rows)
+        if sample.empty:
+            return df
+        
+        low_cardinality = [
+            col for col in df.columns
+            if df[col].dtype == object and sample[col].nunique() / len(sample) < max_ratio
         ]
+        if not low_cardinality:
+            return df
         
-        # Email pattern
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        
-        # Phone pattern
-        phone_pattern = r'^[\+]?[1-9][\d\s\-\(\)]{7,15}$'
+        df = df.copy(deep=False)
+        for col in low_cardinality:
+            df[col] = df[col].astype('category')
+        return df
+    
+    def _detect_data_type_advanced(self, series: pd.Series) -> Dict[str, Any]:
+        """Advanced data type detection with confidence scoring"""
+        # Bound the work by row count before any string conversion
+        non_null = series.head(self.sample_cap).dropna()
+        
+        # Fast path: a few values that all match an unambiguous pattern decide the type
+        first = _as_str_series(non_null.head(self.fastpath_head)).str.strip()
+        if len(first):
+            for fast_type, patterns in _FASTPATH_PATTERNS:
+                if any(first.str.match(pattern).all() for pattern in patterns):
+                    return {
+                        'suggested_type': self._map_to_frappe_fieldtype(fast_type),
+                        'confidence': 1.0,
+                        'alternatives': {}
+                    }
+        
+        sample_series = _as_str_series(non_null.head(50)).str.strip()
+        type_scores = {}
         
         # Score each type
-        for pattern_type, patterns in [
-            ('Currency', currency_patterns),
-            ('ID', id_patterns),
-            ('Date', date_patterns),
-            ('Email', [email_pattern]),
-            ('Phone', [phone_pattern])
-        ]:
-            if isinstance(patterns, list):
-                score = max([self._pattern_match_score(sample_values, pattern) for pattern in patterns])
-            else:
-                score = self._pattern_match_score(sample_values, patterns)
-            type_scores[pattern_type] = score
+        for pattern_type, patterns in _TYPE_PATTERNS:
+            type_scores[pattern_type] = max(self._pattern_match_score(sample_series, pattern) for pattern in patterns)
         
         # Numeric check
-        numeric_count = 0
-        for val in sample_values:
-            try:
-                float(val.replace(',', ''))
-                numeric_count += 1
-            except:
-                pass
-        
-        type_scores['Float'] = numeric_count / len(sample_values) if sample_values else 0
+        numeric_count = _count_numeric(sample_series) if len(sample_series) else 0
+        type_scores['Float'] = numeric_count / len(sample_series) if len(sample_series) else 0
         type_scores['Text'] = 0.3  # Default fallback
         
         best_type = max(type_scores, key=type_scores.get)
@@ -136,13 +349,12 @@ class IntelligentSchemaDetector:
             'alternatives': {k: v for k, v in type_scores.items() if k != best_type}
         }
     
-    def _pattern_match_score(self, values: List[str], pattern: str) -> float:
+    def _pattern_match_score(self, values: pd.Series, pattern: re.Pattern) -> float:
         """Calculate pattern match score"""
-        if not values:
+        if not len(values):
             return 0.0
         
-        matches = sum(1 for val in values if re.match(pattern, str(val).strip()))
-        return matches / len(values)
+        return float(values.str.match(pattern).mean())
     
     def _map_to_frappe_fieldtype(self, detected_type: str) -> str:
         """Map detected type to Frappe field type"""
@@ -163,50 +375,25 @@ class IntelligentSchemaDetector:
         clean = re.sub(r'_+', '_', clean).strip('_')
         return clean[:140]  # Frappe field name limit
     
-    def _detect_business_context(self, field_name: str, sample_values: List[str]) -> str:
+    def _detect_business_context(self, field_name: str, sample_values: pd.Series) -> str:
         """Detect business context of field"""
-        field_lower = field_name.lower()
-        
-        if any(word in field_lower for word in ['customer', 'client', 'buyer']):
-            return 'Customer'
-        elif any(word in field_lower for word in ['vendor', 'supplier', 'seller']):
-            return 'Supplier'
-        elif any(word in field_lower for word in ['product', 'item', 'inventory']):
-            return 'Item'
-        elif any(word in field_lower for word in ['address', 'location', 'city', 'state']):
-            return 'Address'
-        elif any(word in field_lower for word in ['invoice', 'bill', 'payment']):
-            return 'Accounting'
-        
-        return 'General'
+        return _BUSINESS_CONTEXT_MATCHER.first(field_name.lower(), 'General')
     
     def _predict_doctype_ensemble(self, column_profiles: Dict, filename: str) -> Dict[str, Any]:
         """Predict DocType using multiple strategies"""
         predictions = {}
         
         # Strategy 1: Filename analysis
-        filename_lower = filename.lower()
-        if 'customer' in filename_lower:
-            predictions['filename'] = ('Customer', 0.8)
-        elif 'supplier' in filename_lower or 'vendor' in filename_lower:
-            predictions['filename'] = ('Supplier', 0.8)
-        elif 'item' in filename_lower or 'product' in filename_lower:
-            predictions['filename'] = ('Item', 0.8)
-        elif 'invoice' in filename_lower:
-            predictions['filename'] = ('Sales Invoice', 0.8)
-        elif 'payment' in filename_lower:
-            predictions['filename'] = ('Payment Entry', 0.8)
+        filename_doctype = _FILENAME_DOCTYPE_MATCHER.first(filename.lower())
+        if filename_doctype:
+            predictions['filename'] = (filename_doctype, 0.8)
         
         # Strategy 2: Field pattern analysis
-        field_contexts = [profile['business_context'] for profile in column_profiles.values()]
-        context_counts = {}
-        for context in field_contexts:
-            context_counts[context] = context_counts.get(context, 0) + 1
+        context_counts = Counter(profile['business_context'] for profile in column_profiles.values())
         
         if context_counts:
-            dominant_context = max(context_counts, key=context_counts.get)
-            confidence = context_counts[dominant_context] / len(field_contexts)
-            predictions['fields'] = (dominant_context, confidence)
+            dominant_context, dominant_count = context_counts.most_common(1)[0]
+            predictions['fields'] = (dominant_context, dominant_count / context_counts.total())
         
         # Combine predictions
         if predictions:
@@ -221,17 +408,21 @@ class IntelligentSchemaDetector:
         mappings = {}
         
         # Get target DocType fields if it exists
-        target_fields = []
-        if frappe.db.exists('DocType', target_doctype):
-            target_fields = frappe.get_meta(target_doctype).fields
+        try:
+            target_fieldnames = _get_doctype_field_index(target_doctype)[1]
+        except frappe.DoesNotExistError:
+            target_fieldnames = frozenset()
+        
+        # Nothing to match against yet; the DocType will be built from the clean names
+        if not target_fieldnames:
+            return {source_field: profile['clean_name'] for source_field, profile in column_profiles.items()}
         
         for source_field, profile in column_profiles.items():
             clean_name = profile['clean_name']
             business_context = profile['business_context']
             
             # Try exact match first
-            exact_matches = [f for f in target_fields if f.fieldname == clean_name]
-            if exact_matches:
+            if clean_name in target_fieldnames:
                 mappings[source_field] = clean_name
                 continue
             
@@ -246,34 +437,7 @@ class IntelligentSchemaDetector:
     
     def _get_semantic_mapping(self, source_field: str, context: str, target_doctype: str) -> str:
         """Get semantic field mapping"""
-        field_lower = source_field.lower()
-        
-        # Common mappings
-        common_mappings = {
-            'customer': 'customer_name',
-            'supplier': 'supplier_name',
-            'vendor': 'supplier_name',
-            'item': 'item_name',
-            'product': 'item_name',
-            'email': 'email_id',
-            'phone': 'mobile_no',
-            'mobile': 'mobile_no',
-            'address': 'address_line1',
-            'city': 'city',
-            'state': 'state',
-            'country': 'country',
-            'total': 'grand_total',
-            'amount': 'amount',
-            'quantity': 'qty',
-            'rate': 'rate',
-            'date': 'date'
-        }
-        
-        for key, value in common_mappings.items():
-            if key in field_lower:
-                return value
-        
-        return None
+        return _SEMANTIC_MATCHER.first(source_field.lower())
 
 # Modify the existing process_csv_files_with_jit function
 # def process_csv_files_with_jit():
@@ -450,6 +614,41 @@ class IntelligentSchemaDetector:
 #     except Exception as e:
 #         migration_logger.logger.error(f"Enhanced CSV processing failed: {str(e)}")
 
+def _iter_batch_results(process_batch):
+    """Yield batch results until a batch comes back empty"""
+    while True:
+        batch_results = process_batch()
+        if not batch_results or not any(batch_results.values()):
+            return
+        yield batch_results
+
+def _run_buffered_batches(process_batch, result_keys, max_batches: int, migration_logger,
+                          is_expired=None) -> Tuple[Dict[str, int], bool]:
+    """Drive buffered batch processing and total the counts named in result_keys
+
+    Returns (totals, timed_out). When is_expired (e.g. PerformanceMonitor.is_expired) is given it is
+    polled after every batch, and the run stops once it returns True; rows not reached stay pending.
+    """
+    totals = Counter(dict.fromkeys(result_keys, 0))
+    for batch_count, batch_results in enumerate(islice(_iter_batch_results(process_batch), max_batches), 1):
+        totals.update({key: batch_results[key] for key in result_keys if key in batch_results})
+        migration_logger.logger.info(f"📈 Batch {batch_count} results: {batch_results}")
+        if is_expired is not None and is_expired():
+            migration_logger.logger.error(
+                f"⏰ Stopped after batch {batch_count}: operation time limit exceeded, remaining rows stay pending"
+            )
+            return dict(totals), True
+    return dict(totals), False
+
+def _operation_deadline():
+    """is_expired callable for a run limited to MAX_OPERATION_TIME_SECONDS from now"""
+    from data_migration_tool.data_migration.utils.migration_config import migration_config
+    deadline = time.monotonic() + int(migration_config.get('MAX_OPERATION_TIME_SECONDS'))
+
+    def is_expired():
+        return time.monotonic() > deadline
+    return is_expired
+
 # Add this new function for intelligent data processing
 def process_data_with_intelligent_merge(csv_connector, target_doctype, df, settings, migration_logger, field_mappings):
     """Process data with intelligent insert/update logic and handle empty fields"""
@@ -457,76 +656,32 @@ def process_data_with_intelligent_merge(csv_connector, target_doctype, df, setti
     batch_size = int(getattr(settings, 'csv_chunk_size', 1000))
     total_results = {'success': 0, 'failed': 0, 'skipped': 0, 'updated': 0}
     
-    # Get existing records for merge detection
-    try:
-        doctype_meta = frappe.get_meta(target_doctype)
-        unique_fields = []
-        for field in doctype_meta.fields:
-            if field.unique or field.fieldname in ['name', 'id', 'code', 'email']:
-                unique_fields.append(field.fieldname)
-        
-        existing_records = {}
-        if unique_fields:
-            identifier_field = unique_fields[0]
-            migration_logger.logger.info(f"Using {identifier_field} as unique identifier for merge operations")
-            
-            # Get existing records
-            existing_values = frappe.db.sql(f"""
-                SELECT name, {identifier_field} 
-                FROM `tab{target_doctype}` 
-                WHERE {identifier_field} IS NOT NULL AND {identifier_field} != ''
-            """)
-            
-            for record in existing_values:
-                if len(record) >= 2 and record[1]:
-                    existing_records[str(record[1]).strip().lower()] = record[0]
-                    
-    except Exception as e:
-        migration_logger.logger.warning(f"Could not determine merge strategy: {str(e)} - will insert only")
-        existing_records = {}
-    
-    # Process in batches
-    batch_count = 0
-    max_batches = 100
-    
-    while batch_count < max_batches:
-        batch_count += 1
-        
-        # Process batch with intelligent merging
-        if existing_records:
-            batch_results = csv_connector.process_buffered_data_with_intelligent_merge(
-                target_doctype, 
-                batch_size, 
-                existing_records,
-                field_mappings
-            )
-        else:
-            batch_results = csv_connector.process_buffered_data_with_upsert(
-                target_doctype, 
-                batch_size,
-                field_mappings
-            )
-        
-        # Aggregate results
-        for key in total_results:
-            if key in batch_results:
-                total_results[key] += batch_results[key]
-        
-        migration_logger.logger.info(f"Batch {batch_count} results: {batch_results}")
-        
-        # Stop if no more data to process
-        if sum(batch_results.values()) == 0:
-            break
-    
-    return total_results
+    # The hash-based upsert decides insert, update or skip for each buffered row itself
+    return _run_buffered_batches(
+        lambda: csv_connector.process_buffered_data_with_upsert(target_doctype, batch_size, field_mappings),
+        total_results, 100, migration_logger
+    )[0]
 
 
-def convert_numpy_types(obj):
-    """Recursively convert numpy types to Python native types for JSON serialization."""
+def _contains_numpy(obj) -> bool:
+    """True if a nested dict/list structure holds any numpy scalar or array"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (np.generic, np.ndarray)):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
+
+def _convert_numpy_tree(obj):
+    """Rebuild a dict/list structure with numpy values replaced by native Python ones"""
     if isinstance(obj, dict):
-        return {k: convert_numpy_types(v) for k, v in obj.items()}
+        return {k: _convert_numpy_tree(v) for k, v in obj.items()}
     elif isinstance(obj, list):
-        return [convert_numpy_types(i) for i in obj]
+        return [_convert_numpy_tree(i) for i in obj]
     elif isinstance(obj, (np.integer, np.int64)):
         return int(obj)
     elif isinstance(obj, (np.floating, np.float64)):
@@ -538,6 +693,24 @@ def convert_numpy_types(obj):
     else:
         return obj
 
+def convert_numpy_types(obj):
+    """Recursively convert numpy types to Python native types for JSON serialization.
+    
+    Structures without any numpy value are returned unchanged; otherwise a fresh copy is built.
+    """
+    if not _contains_numpy(obj):
+        return obj
+    return _convert_numpy_tree(obj)
+
+def dumps_numpy_safe(obj) -> str:
+    """Serialize to a JSON string, handling numpy scalars and arrays natively when orjson is available"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # Types orjson does not know; use the stdlib path below
+    return json.dumps(convert_numpy_types(obj))
+
 def periodic_crm_sync():
     """Main scheduled function for CRM synchronization with JIT processing"""
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
@@ -590,25 +763,28 @@ def periodic_crm_sync():
         except:
             pass
 
-def clean_doctype_name(filename: str) -> str:
-    """
-    FIXED: Clean filename to create VALID Frappe DocType name WITH SPACES
-    
-    Frappe DocType Rules:
-    - Must have Title Case WITH spaces (e.g., "Yawlit Customers")
-    - Max 61 characters
-    - Only alphanumeric and spaces
-    - Cannot start with number
-    
-    Examples:
-    - "Yawlit Customers.csv" → "Yawlit Customers"
-    - "customers_updted.csv" → "Customers Updted"
-    - "test_products.csv" → "Test Products"  
-    - "customer_data.csv" → "Customer Data"
-    """
-    if not filename:
-        return "Custom Import Data"
-    
+# Exact match mapping for standard DocTypes
+_STANDARD_DOCTYPE_NAMES = {
+    'Vendor': 'Supplier',
+    'Vendors': 'Supplier',
+    'Supplier': 'Supplier',
+    'Suppliers': 'Supplier',
+    'Contact': 'Contact',
+    'Contacts': 'Contact',
+    'Customer': 'Customer',
+    'Customers': 'Customer',
+    'Address': 'Address',
+    'Addresses': 'Address',
+    'Lead': 'Lead',
+    'Leads': 'Lead'
+}
+
+_DOCTYPE_NAME_BAD_CHARS_RE = re.compile(r'[^a-zA-Z0-9\s]')
+_DOCTYPE_NAME_SUFFIX_RE = re.compile(r'\s+(updated?|updted|new|final|latest|copy)\s*$', re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
+def _normalize_doctype_name(filename: str) -> Tuple[str, Optional[str]]:
+    """Pure string part of clean_doctype_name: (cleaned name, standard DocType it maps to or None)"""
     # Remove file extension
     base_name = Path(filename).stem
     
@@ -616,39 +792,18 @@ def clean_doctype_name(filename: str) -> str:
     base_name = base_name.replace('_', ' ').replace('-', ' ')
     
     # Remove special characters but KEEP SPACES
-    clean_name = re.sub(r'[^a-zA-Z0-9\s]', ' ', base_name)
+    clean_name = _DOCTYPE_NAME_BAD_CHARS_RE.sub(' ', base_name)
     
     # Convert to Title Case and clean up multiple spaces
     clean_name = ' '.join(word.capitalize() for word in clean_name.split())
     
     # ✅ CRITICAL FIX: Remove "updated" and similar suffixes that cause confusion
-    clean_name = re.sub(r'\s+(updated?|updted|new|final|latest|copy)\s*$', '', clean_name, flags=re.IGNORECASE)
+    clean_name = _DOCTYPE_NAME_SUFFIX_RE.sub('', clean_name)
     
     # ✅ CRITICAL: DO NOT REMOVE SPACES!
     # The old line: clean_name = clean_name.replace(' ', '')  # ❌ THIS WAS THE BUG!
     
-    # Exact match mapping for standard DocTypes
-    exact_mappings = {
-        'Vendor': 'Supplier',
-        'Vendors': 'Supplier',
-        'Supplier': 'Supplier',
-        'Suppliers': 'Supplier',
-        'Contact': 'Contact',
-        'Contacts': 'Contact',
-        'Customer': 'Customer',
-        'Customers': 'Customer',
-        'Address': 'Address',
-        'Addresses': 'Address',
-        'Lead': 'Lead',
-        'Leads': 'Lead'
-    }
-    
-    # Check exact mapping
-    if clean_name in exact_mappings:
-        mapped_doctype = exact_mappings[clean_name]
-        if frappe.db.exists('DocType', mapped_doctype):
-            frappe.logger().info(f"✅ Mapped '{filename}' to existing DocType: '{mapped_doctype}'")
-            return mapped_doctype
+    mapped_doctype = _STANDARD_DOCTYPE_NAMES.get(clean_name)
     
     # Ensure not too long (Frappe limit is 61 characters)
     if len(clean_name) > 61:
@@ -662,6 +817,34 @@ def clean_doctype_name(filename: str) -> str:
     if not clean_name or clean_name.isspace():
         clean_name = "Custom Import Data"
     
+    return clean_name, mapped_doctype
+
+def clean_doctype_name(filename: str) -> str:
+    """
+    FIXED: Clean filename to create VALID Frappe DocType name WITH SPACES
+    
+    Frappe DocType Rules:
+    - Must have Title Case WITH spaces (e.g., "Yawlit Customers")
+    - Max 61 characters
+    - Only alphanumeric and spaces
+    - Cannot start with number
+    
+    Examples:
+    - "Yawlit Customers.csv" → "Yawlit Customers"
+    - "customers_updted.csv" → "Customers Updted"
+    - "test_products.csv" → "Test Products"  
+    - "customer_data.csv" → "Customer Data"
+    """
+    if not filename:
+        return "Custom Import Data"
+    
+    clean_name, mapped_doctype = _normalize_doctype_name(filename)
+    
+    # Check exact mapping; existence is not cached since the DocType may be installed later
+    if mapped_doctype and frappe.db.exists('DocType', mapped_doctype):
+        frappe.logger().info(f"✅ Mapped '{filename}' to existing DocType: '{mapped_doctype}'")
+        return mapped_doctype
+    
     frappe.logger().info(f"📝 Cleaned DocType name: '{filename}' → '{clean_name}'")
     return clean_name
 
@@ -690,6 +873,186 @@ def clear_doctype_cache_comprehensive(self, doctype_name: str):
     except Exception as e:
         self.logger.logger.warning(f"⚠️ Cache clearing failed: {str(e)}")
 
+def _move_file(src: str, dst: str):
+    """Rename a file into place, copying only when it has to cross filesystems"""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+def _ensure_watch_subdirs(watch_dir: str) -> Tuple[str, str, str]:
+    """Create processed/errors/pending under a watch directory if missing and return their paths"""
+    # Checked on every run: operators or cleanup jobs may delete these between runs
+    subdirs = tuple(os.path.join(watch_dir, name) for name in ('processed', 'errors', 'pending'))
+    for directory in subdirs:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+    return subdirs
+
+# Per-thread {site: (CSVConnector, DynamicDocTypeCreator)} reused across scheduler runs
+_scheduler_components = threading.local()
+
+def _get_scheduler_components() -> tuple:
+    """Connector and mapper for this site and thread, with a fresh import session per run"""
+    cache = getattr(_scheduler_components, 'by_site', None)
+    if cache is None:
+        cache = _scheduler_components.by_site = {}
+    
+    components = cache.get(frappe.local.site)
+    if components is None:
+        from data_migration_tool.data_migration.mappers.doctype_creator import DynamicDocTypeCreator
+        from data_migration_tool.data_migration.connectors.csv_connector import CSVConnector
+        from data_migration_tool.data_migration.utils.logger_config import migration_logger
+        components = cache[frappe.local.site] = (CSVConnector(migration_logger), DynamicDocTypeCreator(migration_logger))
+    else:
+        components[0].start_import_session()
+    return components
+
+def _process_jit_file(filename, filepath, settings, csv_connector, mapper,
+                      processed_dir, error_dir, pending_dir, existing_requests: dict,
+                      auto_create_enabled: bool) -> Tuple[str, Optional[tuple]]:
+    """Process one watch-directory file; returns (outcome, queued approval request or None)"""
+    from data_migration_tool.data_migration.utils.logger_config import migration_logger
+    
+    try:
+        migration_logger.logger.info(f"🔍 Analyzing file: {filename}")
+        
+        # Step 1: Read and analyze CSV structure
+        df = csv_connector.read_file_as_strings(filepath)
+        if df.empty:
+            migration_logger.logger.warning(f"⚠️ Empty file: {filename}")
+            return 'error', None
+
+        headers = list(df.columns)
+        data_sample = get_data_sample_from_df(df)
+        
+        # Step 2: Check if auto-creation is enabled, otherwise use manual request workflow
+        if auto_create_enabled:
+            # Use auto-detection and import workflow
+            migration_logger.logger.info(f"🤖 Starting automated DocType detection and import for: {filename}")
+            
+            # Use the auto_detect_and_import method that handles both cases:
+            # 1. Find existing DocType with matching headers -> import directly
+            # 2. No match found -> create new DocType and import
+            try:
+                result = csv_connector.auto_detect_and_import(filepath, settings, df=df)
+                
+                if result['success']:
+                    target_doctype = result['target_doctype']
+                    action_taken = result['action_taken']
+                    import_results = result['import_results']['processing_results']
+                    
+                    # Log the action taken
+                    outcome = 'processed'
+                    if action_taken == "matched_existing":
+                        migration_logger.logger.info(f"✅ Used existing DocType: {target_doctype} (confidence: {result['detection_details']['confidence']:.1%})")
+                        outcome = 'schema_matched'
+                    elif action_taken == "created_new":
+                        migration_logger.logger.info(f"🆕 Created new DocType: {target_doctype}")
+                        clear_doctype_field_index()
+                        # Register this schema for future use
+                        try:
+                            register_csv_schema(
+                                filename,
+                                headers,
+                                target_doctype,
+                                data_sample,
+                                result['detection_details'].get('confidence', 1.0)
+                            )
+                        except Exception as reg_error:
+                            migration_logger.logger.warning(f"⚠️ Could not register schema: {str(reg_error)}")
+                    elif action_taken == "approval_requested":
+                        migration_logger.logger.info(f"📝 DocType creation approval requested: {result['approval_request_id']}")
+                        migration_logger.logger.info(f"⏳ CSV will be processed after approval")
+                        
+                        # Move to pending approval directory (or keep in pending)
+                        migration_logger.logger.info(f"📂 File kept in pending for approval: {filename}")
+                        return 'approval_needed', None
+                    
+                    # Move to processed
+                    processed_path = os.path.join(processed_dir, filename)
+                    _move_file(filepath, processed_path)
+                    
+                    migration_logger.logger.info(f"🎉 Auto-import completed: {import_results}")
+                    
+                    # Log recommendations if any
+                    if result.get('recommendations'):
+                        for rec in result['recommendations']:
+                            migration_logger.logger.info(f"💡 Recommendation: {rec}")
+                    
+                    return outcome, None
+                    
+                else:
+                    # Auto-import failed - fall back to manual request
+                    error_msg = result.get('error', 'Unknown error in auto-import')
+                    migration_logger.logger.warning(f"⚠️ Auto-import failed for {filename}: {error_msg}")
+                    migration_logger.logger.info(f"📝 Falling back to manual DocType creation request")
+                    
+                    # Fall through to manual request creation
+                    
+            except Exception as auto_error:
+                migration_logger.logger.error(f"❌ Auto-detection failed for {filename}: {str(auto_error)}")
+                migration_logger.logger.info(f"📝 Falling back to manual DocType creation request")
+                # Fall through to manual request creation
+        
+        # Manual DocType creation request workflow (when auto_create_doctypes=False or as fallback)
+        migration_logger.logger.info(f"📝 Creating manual DocType creation request for: {filename}")
+        
+        # Analyze CSV structure for manual request
+        analysis = mapper.analyze_csv_structure(df)
+        suggested_doctype = clean_doctype_name(filename)
+        
+        # Check if we already have a pending request for this file
+        existing_request = existing_requests.get(filename)
+        
+        if existing_request:
+            migration_logger.logger.info(f"⏳ Request already exists for {filename}: {existing_request}")
+            # Move to pending if not already there
+            pending_path = os.path.join(pending_dir, filename)
+            if not os.path.exists(pending_path):
+                _move_file(filepath, pending_path)
+            return 'pending', None
+        
+        # The approval request itself is created by the caller together with the others
+        return 'queued', (filename, filepath, suggested_doctype, analysis)
+
+    except Exception as e:
+        migration_logger.logger.error(f"❌ Failed to process {filename}: {str(e)}")
+        error_path = os.path.join(error_dir, filename)
+        try:
+            _move_file(filepath, error_path)
+        except:
+            pass
+        return 'error', None
+
+def _process_jit_file_in_thread(site, sites_path, user, filename, filepath, settings,
+                                processed_dir, error_dir, pending_dir, existing_requests: dict,
+                                auto_create_enabled: bool) -> Tuple[str, Optional[tuple]]:
+    """Run _process_jit_file on a worker thread with its own Frappe context and connection"""
+    from data_migration_tool.data_migration.connectors.csv_connector import CSVConnector
+    from data_migration_tool.data_migration.mappers.doctype_creator import DynamicDocTypeCreator
+    from data_migration_tool.data_migration.utils.logger_config import migration_logger
+    
+    # frappe.local is thread-local, so each worker needs its own site context and DB handle
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    try:
+        frappe.set_user(user)
+        result = _process_jit_file(
+            filename, filepath, settings, CSVConnector(migration_logger), DynamicDocTypeCreator(migration_logger),
+            processed_dir, error_dir, pending_dir, existing_requests, auto_create_enabled
+        )
+        # This connection is closed below, so settle its transaction explicitly
+        frappe.db.commit()
+        return result
+    except Exception:
+        frappe.db.rollback()
+        raise
+    finally:
+        frappe.destroy()
+
 def process_csv_files_with_jit():
     """CONFIGURABLE CSV processing with intelligent DocType detection
     
@@ -709,9 +1072,8 @@ def process_csv_files_with_jit():
     
     This provides flexibility between full automation and manual control.
     """
-    from data_migration_tool.data_migration.connectors.csv_connector import CSVConnector
-    from data_migration_tool.data_migration.mappers.doctype_creator import DynamicDocTypeCreator
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
+    from data_migration_tool.data_migration.utils.migration_config import migration_config
     
     try:
         # Set proper user context
@@ -730,25 +1092,23 @@ def process_csv_files_with_jit():
             return
 
         # Initialize components
-        csv_connector = CSVConnector(migration_logger)
-        mapper = DynamicDocTypeCreator(migration_logger)
+        csv_connector, mapper = _get_scheduler_components()
         
-        watch_dir = settings.csv_watch_directory
-        processed_dir = os.path.join(watch_dir, 'processed')
-        error_dir = os.path.join(watch_dir, 'errors')
-        pending_dir = os.path.join(watch_dir, 'pending')
+        # Settings read once per run rather than per file
+        auto_create_enabled = bool(getattr(settings, 'auto_create_doctypes', True))
+        supported_formats = frozenset(csv_connector.supported_formats)
         
-        # Ensure directories exist
-        for directory in [processed_dir, error_dir, pending_dir]:
-            os.makedirs(directory, exist_ok=True)
+        watch_dir = settings.csv_watch_directory
+        processed_dir, error_dir, pending_dir = _ensure_watch_subdirs(watch_dir)
 
         # Get processable files
         processable_files = []
-        for filename in os.listdir(watch_dir):
-            if filename.startswith('.') or not os.path.isfile(os.path.join(watch_dir, filename)):
-                continue
-            if Path(filename).suffix.lower() in csv_connector.supported_formats:
-                processable_files.append((filename, os.path.join(watch_dir, filename)))
+        with os.scandir(watch_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                if os.path.splitext(entry.name)[1].lower() in supported_formats:
+                    processable_files.append((entry.name, entry.path))
 
         if not processable_files:
             migration_logger.logger.info("No CSV files found to process")
@@ -756,140 +1116,67 @@ def process_csv_files_with_jit():
 
         migration_logger.logger.info(f"📁 Found {len(processable_files)} files for intelligent processing")
         
-        processed_count = 0
-        error_count = 0
-        pending_count = 0
-        approval_needed_count = 0
-        schema_matched_count = 0
-        pending_count = 0
-        schema_matched_count = 0
-
-        for filename, filepath in processable_files:
-            try:
-                migration_logger.logger.info(f"🔍 Analyzing file: {filename}")
-                
-                # Step 1: Read and analyze CSV structure
-                df = csv_connector.read_file_as_strings(filepath)
-                if df.empty:
-                    migration_logger.logger.warning(f"⚠️ Empty file: {filename}")
-                    error_count += 1
-                    continue
+        # Open approval requests for all candidate files, fetched in one query
+        existing_requests = dict(frappe.db.sql("""
+            SELECT source_file, name FROM `tabDocType Creation Request`
+            WHERE status IN ('Pending', 'Approved', 'Redirected') AND source_file IN %(files)s
+        """, {'files': tuple(filename for filename, _ in processable_files)}))
+        
+        # Files are independent and I/O bound; optionally overlap them on worker threads
+        max_workers = min(int(migration_config.get('MAX_FILE_WORKERS', 1) or 1), len(processable_files))
+        if max_workers > 1:
+            site, sites_path, user = frappe.local.site, frappe.local.sites_path, frappe.session.user
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                file_results = list(executor.map(
+                    lambda item: _process_jit_file_in_thread(
+                        site, sites_path, user, item[0], item[1], settings,
+                        processed_dir, error_dir, pending_dir, existing_requests, auto_create_enabled
+                    ),
+                    processable_files
+                ))
+        else:
+            file_results = [
+                _process_jit_file(filename, filepath, settings, csv_connector, mapper,
+                                  processed_dir, error_dir, pending_dir, existing_requests, auto_create_enabled)
+                for filename, filepath in processable_files
+            ]
+        
+        outcomes = Counter(outcome for outcome, _ in file_results)
+        queued_requests = [queued for _, queued in file_results if queued]
+        processed_count = outcomes['processed'] + outcomes['schema_matched']
+        schema_matched_count = outcomes['schema_matched']
+        approval_needed_count = outcomes['approval_needed']
+        pending_count = outcomes['pending']
+        error_count = outcomes['error']
 
-                headers = list(df.columns)
-                data_sample = get_data_sample_from_df(df)
-                
-                # Step 2: Check if auto-creation is enabled, otherwise use manual request workflow
-                auto_create_enabled = getattr(settings, 'auto_create_doctypes', True)
-                
-                if auto_create_enabled:
-                    # Use auto-detection and import workflow
-                    migration_logger.logger.info(f"🤖 Starting automated DocType detection and import for: {filename}")
-                    
-                    # Use the auto_detect_and_import method that handles both cases:
-                    # 1. Find existing DocType with matching headers -> import directly
-                    # 2. No match found -> create new DocType and import
-                    try:
-                        result = csv_connector.auto_detect_and_import(filepath, settings)
-                        
-                        if result['success']:
-                            target_doctype = result['target_doctype']
-                            action_taken = result['action_taken']
-                            import_results = result['import_results']['processing_results']
-                            
-                            # Log the action taken
-                            if action_taken == "matched_existing":
-                                migration_logger.logger.info(f"✅ Used existing DocType: {target_doctype} (confidence: {result['detection_details']['confidence']:.1%})")
-                                schema_matched_count += 1
-                            elif action_taken == "created_new":
-                                migration_logger.logger.info(f"🆕 Created new DocType: {target_doctype}")
-                                # Register this schema for future use
-                                try:
-                                    register_csv_schema(
-                                        filename,
-                                        headers,
-                                        target_doctype,
-                                        data_sample,
-                                        result['detection_details'].get('confidence', 1.0)
-                                    )
-                                except Exception as reg_error:
-                                    migration_logger.logger.warning(f"⚠️ Could not register schema: {str(reg_error)}")
-                            elif action_taken == "approval_requested":
-                                migration_logger.logger.info(f"📝 DocType creation approval requested: {result['approval_request_id']}")
-                                migration_logger.logger.info(f"⏳ CSV will be processed after approval")
-                                
-                                # Move to pending approval directory (or keep in pending)
-                                migration_logger.logger.info(f"📂 File kept in pending for approval: {filename}")
-                                approval_needed_count += 1
-                                continue
-                            
-                            # Move to processed
-                            processed_path = os.path.join(processed_dir, filename)
-                            shutil.move(filepath, processed_path)
-                            
-                            migration_logger.logger.info(f"🎉 Auto-import completed: {import_results}")
-                            processed_count += 1
-                            
-                            # Log recommendations if any
-                            if result.get('recommendations'):
-                                for rec in result['recommendations']:
-                                    migration_logger.logger.info(f"💡 Recommendation: {rec}")
-                            
-                            continue
-                            
-                        else:
-                            # Auto-import failed - fall back to manual request
-                            error_msg = result.get('error', 'Unknown error in auto-import')
-                            migration_logger.logger.warning(f"⚠️ Auto-import failed for {filename}: {error_msg}")
-                            migration_logger.logger.info(f"📝 Falling back to manual DocType creation request")
-                            
-                            # Fall through to manual request creation
-                            
-                    except Exception as auto_error:
-                        migration_logger.logger.error(f"❌ Auto-detection failed for {filename}: {str(auto_error)}")
-                        migration_logger.logger.info(f"📝 Falling back to manual DocType creation request")
-                        # Fall through to manual request creation
-                
-                # Manual DocType creation request workflow (when auto_create_doctypes=False or as fallback)
-                migration_logger.logger.info(f"📝 Creating manual DocType creation request for: {filename}")
-                
-                # Analyze CSV structure for manual request
-                analysis = mapper.analyze_csv_structure(df)
-                suggested_doctype = clean_doctype_name(filename)
-                
-                # Check if we already have a pending request for this file
-                existing_request = frappe.db.get_value(
-                    'DocType Creation Request',
-                    {'source_file': filename, 'status': ['in', ['Pending', 'Approved', 'Redirected']]},
-                    'name'
+        # Create all approval requests with a single commit, then move their files to pending
+        if queued_requests:
+            try:
+                request_ids = create_doctype_creation_requests(
+                    [(filename, suggested_doctype, analysis) for filename, _, suggested_doctype, analysis in queued_requests]
                 )
-                
-                if existing_request:
-                    migration_logger.logger.info(f"⏳ Request already exists for {filename}: {existing_request}")
-                    # Move to pending if not already there
-                    pending_path = os.path.join(pending_dir, filename)
-                    if not os.path.exists(pending_path):
-                        shutil.move(filepath, pending_path)
-                    pending_count += 1
+            except Exception as e:
+                migration_logger.logger.error(f"❌ Failed to create approval requests: {str(e)}")
+                request_ids = [None] * len(queued_requests)
+            
+            for (filename, filepath, _, _), request_id in zip(queued_requests, request_ids, strict=True):
+                if not request_id:
+                    try:
+                        _move_file(filepath, os.path.join(error_dir, filename))
+                    except:
+                        pass
+                    error_count += 1
                     continue
                 
-                # Create new approval request
-                request_id = send_doctype_creation_request(filename, suggested_doctype, analysis)
                 migration_logger.logger.info(f"📝 Created manual approval request: {request_id}")
-                
-                # Move to pending
-                pending_path = os.path.join(pending_dir, filename)
-                shutil.move(filepath, pending_path)
-                pending_count += 1
-
-            except Exception as e:
-                migration_logger.logger.error(f"❌ Failed to process {filename}: {str(e)}")
-                error_path = os.path.join(error_dir, filename)
                 try:
-                    shutil.move(filepath, error_path)
-                except:
-                    pass
-                error_count += 1
+                    _move_file(filepath, os.path.join(pending_dir, filename))
+                except Exception as move_error:
+                    migration_logger.logger.error(f"❌ Failed to move {filename} to pending: {str(move_error)}")
+                pending_count += 1
 
+        total_files = processed_count + pending_count + error_count + approval_needed_count
+        success_rate = (processed_count / total_files * 100) if total_files else 0.0
         migration_logger.logger.info(f"""
 🎉 AUTOMATED processing completed:
    📊 Auto-Processed: {processed_count}
@@ -897,87 +1184,13 @@ def process_csv_files_with_jit():
    📝 DocType Approval Needed: {approval_needed_count}
    ⏳ Manual Approval Needed: {pending_count}
    ❌ Errors: {error_count}
-   🤖 Success Rate: {(processed_count/(processed_count+pending_count+error_count+approval_needed_count)*100):.1f}% automated
+   🤖 Success Rate: {success_rate:.1f}% automated
         """)
 
     except Exception as e:
         migration_logger.logger.error(f"❌ Enhanced CSV processing failed: {str(e)}")
 
 
-# Helper function for intelligent data processing
-def process_data_with_intelligent_merge(csv_connector, target_doctype, df, settings, migration_logger, field_mappings):
-    """Process data with intelligent insert/update logic"""
-    
-    batch_size = int(getattr(settings, 'csv_chunk_size', 1000))
-    total_results = {'success': 0, 'failed': 0, 'skipped': 0, 'updated': 0}
-    
-    try:
-        # Get existing records for merge detection
-        doctype_meta = frappe.get_meta(target_doctype)
-        unique_fields = []
-        for field in doctype_meta.fields:
-            if field.unique or field.fieldname in ['name', 'id', 'code', 'email_id']:
-                unique_fields.append(field.fieldname)
-        
-        existing_records = {}
-        if unique_fields:
-            identifier_field = unique_fields[0]
-            migration_logger.logger.info(f"🔍 Using '{identifier_field}' as unique identifier for merge operations")
-            
-            # Get existing records
-            try:
-                existing_values = frappe.db.sql(f"""
-                    SELECT name, {identifier_field} 
-                    FROM `tab{target_doctype}` 
-                    WHERE {identifier_field} IS NOT NULL AND {identifier_field} != ''
-                """)
-                
-                for record in existing_values:
-                    if len(record) >= 2 and record[1]:
-                        existing_records[str(record[1]).strip().lower()] = record[0]
-                        
-            except Exception as e:
-                migration_logger.logger.warning(f"Could not load existing records: {str(e)}")
-                
-    except Exception as e:
-        migration_logger.logger.warning(f"⚠️ Could not determine merge strategy: {str(e)} - will insert only")
-        existing_records = {}
-    
-    # Process in batches
-    batch_count = 0
-    max_batches = 50
-    
-    while batch_count < max_batches:
-        batch_count += 1
-        
-        # Process batch with intelligent merging
-        if existing_records:
-            batch_results = csv_connector.process_buffered_data_with_intelligent_merge(
-                target_doctype, 
-                batch_size, 
-                existing_records,
-                field_mappings
-            )
-        else:
-            batch_results = csv_connector.process_buffered_data_with_upsert(
-                target_doctype, 
-                batch_size,
-                field_mappings
-            )
-        
-        # Aggregate results
-        for key in total_results:
-            if key in batch_results:
-                total_results[key] += batch_results[key]
-        
-        migration_logger.logger.info(f"📈 Batch {batch_count} results: {batch_results}")
-        
-        # Stop if no more data to process
-        if sum(batch_results.values()) == 0:
-            break
-    
-    return total_results
-
 def send_doctype_creation_request_with_analysis(filename, target_doctype, headers, data_sample, field_analysis):
     """FIXED: Send enhanced DocType creation request with detailed analysis"""
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
@@ -997,7 +1210,7 @@ def send_doctype_creation_request_with_analysis(filename, target_doctype, header
             "doctype": "DocType Creation Request",
             "source_file": filename,
             "suggested_doctype": clean_target_doctype,  # ✅ Now properly cleaned with spaces!
-            "field_analysis": json.dumps(convert_numpy_types(field_analysis)),
+            "field_analysis": dumps_numpy_safe(field_analysis),
             "total_records": len(data_sample) if isinstance(data_sample, (list, dict)) else 0,
             "field_count": len(headers),
             "status": "Pending",
@@ -1023,42 +1236,33 @@ def send_approval_notifications(request_id):
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
     try:
         # Get system managers
-        system_managers = frappe.get_all("User", 
-            filters={"role_profile_name": ["like", "%System Manager%"], "enabled": 1},
-            fields=["email", "name"]
-        )
-        
-        if not system_managers:
-            system_managers = frappe.get_all("Has Role",
-                filters={"role": "System Manager", "parenttype": "User"},
-                fields=["parent as name"]
-            )
-            system_managers = frappe.get_all("User",
-                filters={"name": ["in", [sm.name for sm in system_managers]], "enabled": 1},
-                fields=["email", "name"]
-            )
+        system_managers = _get_system_managers()
         
         migration_logger.logger.info(f"📤 Found system managers: {[sm.name for sm in system_managers]}")
         
-        # Send notifications
+        # Insert through the controller so after_insert emails the user and marks the bell unseen;
+        # everything is committed together below
+        subject = "DocType Creation Approval Required"
+        email_content = f"A new DocType creation request {request_id} requires your approval."
+        sent_count = 0
         for manager in system_managers:
             try:
-                notification_doc = frappe.get_doc({
+                frappe.get_doc({
                     "doctype": "Notification Log",
                     "for_user": manager.name,
                     "type": "Alert",
                     "document_type": "DocType Creation Request",
                     "document_name": request_id,
-                    "subject": f"DocType Creation Approval Required",
-                    "email_content": f"A new DocType creation request {request_id} requires your approval."
-                })
-                
-                notification_doc.insert(ignore_permissions=True)
-                migration_logger.logger.info(f"📤 Sent notification to {manager.name}")
-                
+                    "subject": subject,
+                    "email_content": email_content
+                }).insert(ignore_permissions=True)
+                sent_count += 1
             except Exception as e:
                 migration_logger.logger.error(f"Failed to send notification to {manager.name}: {str(e)}")
         
+        if sent_count:
+            migration_logger.logger.info(f"📤 Sent notifications to {sent_count} system managers")
+        
         # Send real-time notifications
         frappe.publish_realtime("doctype_creation_request", {"request_id": request_id}, user="System Manager")
         migration_logger.logger.info("📤 Sent real-time notifications for DocType creation request")
@@ -1073,62 +1277,11 @@ def process_data_with_merge_logic(csv_connector, target_doctype, df, settings, m
     batch_size = int(getattr(settings, 'csv_chunk_size', 1000))
     total_results = {"success": 0, "failed": 0, "skipped": 0, "updated": 0}
 
-    # Get existing records to determine insert vs update
-    existing_records = {}
-    try:
-        # Try to find a unique identifier field
-        doctype_meta = frappe.get_meta(target_doctype)
-        unique_fields = []
-        for field in doctype_meta.fields:
-            if field.unique or field.fieldname in ['name', 'id', 'code', 'email']:
-                unique_fields.append(field.fieldname)
-
-        if unique_fields:
-            # Use first unique field as identifier
-            identifier_field = unique_fields[0]
-            migration_logger.logger.info(f"🔍 Using '{identifier_field}' as unique identifier for merge operations")
-
-            # FIXED: Remove the problematic as_dict parameter
-            existing_values = frappe.db.sql(f"""
-                SELECT name, {identifier_field}
-                FROM `tab{target_doctype}`
-                WHERE {identifier_field} IS NOT NULL
-                AND {identifier_field} != ''
-            """)
-            
-            # Convert to dict format manually
-            for record in existing_values:
-                if len(record) >= 2 and record[1]:  # Ensure record has both values
-                    existing_records[str(record[1]).strip().lower()] = record[0]
-                    
-    except Exception as e:
-        migration_logger.logger.warning(f"⚠️ Could not determine merge strategy: {str(e)} - will insert only")
-
-    # Process in batches with merge logic
-    batch_count = 0
-    max_batches = 100
-
-    while batch_count < max_batches:
-        batch_count += 1
-        
-        # Enhanced processing with merge capabilities
-        if existing_records:
-            batch_results = csv_connector.process_buffered_data_with_merge(
-                target_doctype, batch_size, existing_records
-            )
-        else:
-            batch_results = csv_connector.process_buffered_data_with_upsert(target_doctype, batch_size)
-
-        for key in total_results:
-            if key in batch_results:
-                total_results[key] += batch_results[key]
-
-        migration_logger.logger.info(f"📈 Batch {batch_count} results: {batch_results}")
-        
-        if sum(batch_results.values()) == 0:
-            break
-
-    return total_results
+    # The hash-based upsert decides insert, update or skip for each buffered row itself
+    return _run_buffered_batches(
+        lambda: csv_connector.process_buffered_data_with_upsert(target_doctype, batch_size),
+        total_results, 100, migration_logger
+    )[0]
 
 def process_csv_batch(self, df_chunk: pd.DataFrame, target_doctype: str, 
                      field_mapping: Dict, identifier_fields: List[str]) -> Dict:
@@ -1138,11 +1291,15 @@ def process_csv_batch(self, df_chunk: pd.DataFrame, target_doctype: str,
     # Pre-load existing records for faster lookup
     existing_lookup = self.build_existing_records_lookup(target_doctype, identifier_fields)
     
-    for index, row in df_chunk.iterrows():
+    # Apply field mapping and the null/empty filter to the whole chunk at once
+    mapped_df = df_chunk[[col for col in df_chunk.columns if col in field_mapping]].rename(columns=field_mapping)
+    target_columns = list(mapped_df.columns)
+    keep = (mapped_df.notna() & mapped_df.ne('')).to_numpy()
+    values = mapped_df.to_numpy(dtype=object)
+    
+    for index, row_values, row_keep in zip(df_chunk.index, values, keep, strict=True):
         try:
-            # Apply field mapping
-            mapped_data = {field_mapping[k]: v for k, v in row.to_dict().items() 
-                          if k in field_mapping and pd.notna(v) and v != ''}
+            mapped_data = {field: value for field, value, present in zip(target_columns, row_values, row_keep, strict=True) if present}
             
             # Check for duplicates using lookup
             existing_name = self.find_existing_in_lookup(mapped_data, existing_lookup, identifier_fields)
@@ -1169,10 +1326,22 @@ def process_csv_batch(self, df_chunk: pd.DataFrame, target_doctype: str,
     
     return results
 
+# Approved requests processed between group commits of status-only updates
+_REQUEST_COMMIT_INTERVAL = 10
+
+# Minimum safety cap on buffered batches per approved request
+_PENDING_MAX_BATCHES = 100
+
+def _index_dir_files(directory: str) -> Dict[str, str]:
+    """Map file names to paths for one directory listing (empty if it is missing)"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry.path for entry in entries if entry.is_file()}
+    except OSError:
+        return {}
+
 def check_pending_requests_and_process():
     """FIXED: Check for approved requests with correct exception handling"""
-    from data_migration_tool.data_migration.mappers.doctype_creator import DynamicDocTypeCreator
-    from data_migration_tool.data_migration.connectors.csv_connector import CSVConnector
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
     
     try:
@@ -1195,8 +1364,12 @@ def check_pending_requests_and_process():
         
         migration_logger.logger.info(f"🔄 Found {len(pending_requests)} approved requests to process")
         
-        # Get Migration Settings for directory paths
+        # Get Migration Settings for directory paths and batch size
         settings = frappe.get_single('Migration Settings')
+        batch_size = int(getattr(settings, 'csv_chunk_size', 1000) or 0)
+        if batch_size <= 0:
+            migration_logger.logger.warning(f"⚠️ Invalid csv_chunk_size {batch_size}, using 1000")
+            batch_size = 1000
         try:
             from data_migration_tool.data_migration.utils.path_manager import SecurePathManager
             watch_dir = SecurePathManager.get_watch_directory()
@@ -1204,19 +1377,34 @@ def check_pending_requests_and_process():
             frappe.log_error(f"Failed to get secure watch directory: {str(e)}")
             watch_dir = frappe.get_site_path('private', 'files', 'migration')
             os.makedirs(watch_dir, exist_ok=True)
-        pending_dir = os.path.join(watch_dir, 'pending')
-        processed_dir = os.path.join(watch_dir, 'processed')
-        error_dir = os.path.join(watch_dir, 'errors')
+        processed_dir, error_dir, pending_dir = _ensure_watch_subdirs(watch_dir)
         
-        # Ensure directories exist
-        for directory in [processed_dir, error_dir, pending_dir]:
-            os.makedirs(directory, exist_ok=True)
-        
-        csv_connector = CSVConnector(migration_logger)
-        mapper = DynamicDocTypeCreator(migration_logger)
+        csv_connector, mapper = _get_scheduler_components()
         processed_count = 0
         
-        for request in pending_requests:
+        # One query tells us which redirect targets exist, instead of one exists() per request
+        redirect_targets = tuple({
+            clean_doctype_name(r.final_doctype or r.suggested_doctype)
+            for r in pending_requests if r.status == 'Redirected'
+        })
+        existing_doctypes = set(frappe.db.sql_list(
+            "SELECT name FROM `tabDocType` WHERE name IN %(names)s", {'names': redirect_targets}
+        )) if redirect_targets else set()
+        
+        # Source files almost always sit in pending or the watch dir: list those once,
+        # and only stat the rarely used locations when both listings miss
+        file_indexes = (_index_dir_files(pending_dir), _index_dir_files(watch_dir))
+        fallback_dirs = (
+            os.path.join(watch_dir, 'staging'),
+            frappe.get_site_path('public', 'files'),
+            frappe.get_site_path('private', 'files')
+        )
+        
+        for request_index, request in enumerate(pending_requests, 1):
+            # Each request gets a savepoint. Requests that stop before import are committed in
+            # groups; imports commit on their own, so an imported request commits its status right away
+            savepoint = f"pending_request_{request_index}"
+            frappe.db.savepoint(savepoint)
             try:
                 # Get fresh document instance
                 request_doc = frappe.get_doc('DocType Creation Request', request.name)
@@ -1228,21 +1416,15 @@ def check_pending_requests_and_process():
                 migration_logger.logger.info(f"🔄 Processing approved request: {csv_filename} → {target_doctype}")
                 
                 # Find CSV file
-                search_dirs = [
-                    pending_dir,
-                    watch_dir,
-                    os.path.join(watch_dir, 'staging'),
-                    frappe.get_site_path('public', 'files'),
-                    frappe.get_site_path('private', 'files')
-                ]
-                
-                csv_file_path = None
-                for search_dir in search_dirs:
-                    potential_path = os.path.join(search_dir, csv_filename)
-                    if os.path.exists(potential_path):
-                        csv_file_path = potential_path
-                        migration_logger.logger.info(f"📁 Found CSV file at: {csv_file_path}")
-                        break
+                csv_file_path = next((index[csv_filename] for index in file_indexes if csv_filename in index), None)
+                if not csv_file_path:
+                    for search_dir in fallback_dirs:
+                        potential_path = os.path.join(search_dir, csv_filename)
+                        if os.path.isfile(potential_path):
+                            csv_file_path = potential_path
+                            break
+                if csv_file_path:
+                    migration_logger.logger.info(f"📁 Found CSV file at: {csv_file_path}")
                 
                 if not csv_file_path:
                     migration_logger.logger.error(f"⚠️ CSV file not found: {csv_filename}")
@@ -1252,7 +1434,6 @@ def check_pending_requests_and_process():
                             'status': 'Failed',
                             'created_doctype': 'File Not Found'
                         })
-                        frappe.db.commit()
                     except Exception as update_error:
                         migration_logger.logger.warning(f"⚠️ Could not update failed status: {str(update_error)}")
                     continue
@@ -1264,6 +1445,7 @@ def check_pending_requests_and_process():
                         created_doctype = mapper.create_doctype_from_analysis(field_analysis, target_doctype)
                         migration_logger.logger.info(f"✅ Created DocType: {created_doctype}")
                         target_doctype = created_doctype
+                        existing_doctypes.add(created_doctype)
                         
                         # Update created_doctype using db.set_value to avoid conflicts
                         frappe.db.set_value('DocType Creation Request', request_doc.name, 'created_doctype', created_doctype)
@@ -1280,7 +1462,7 @@ def check_pending_requests_and_process():
                         continue
                         
                 elif request_doc.status == 'Redirected':
-                    if not frappe.db.exists('DocType', target_doctype):
+                    if target_doctype not in existing_doctypes:
                         migration_logger.logger.error(f"❌ Target DocType {target_doctype} does not exist")
                         try:
                             frappe.db.set_value('DocType Creation Request', request_doc.name, {
@@ -1298,57 +1480,91 @@ def check_pending_requests_and_process():
                 try:
                     migration_logger.logger.info(f"📄 Processing CSV file: {csv_filename}")
                     
-                    df = csv_connector.read_file_as_strings(csv_file_path)
-                    if df.empty:
+                    # A run stopped by the time limit left this file's rows buffered: drain those
+                    # instead of buffering the file a second time
+                    previous_results = request_doc.processing_results or {}
+                    if isinstance(previous_results, str):
+                        previous_results = json.loads(previous_results)
+                    resuming = bool(previous_results.get('timed_out'))
+                    if resuming:
+                        row_count = stored_count = frappe.db.count('Migration Data Buffer', {
+                            'source_file': csv_filename,
+                            'target_doctype': target_doctype,
+                            'processing_status': 'Pending'
+                        })
+                        migration_logger.logger.info(f"⏯️ Resuming {csv_filename}: {stored_count} buffered rows pending")
+                    else:
+                        # Stream the file into the buffer chunk by chunk instead of loading it whole
+                        row_count = 0
+                        stored_count = 0
+                        for chunk in csv_connector.read_file_as_strings_iter(csv_file_path):
+                            row_count += len(chunk)
+                            stored_count += csv_connector.store_raw_data(chunk, csv_filename, target_doctype)
+                    
+                    if not row_count and not resuming:
                         migration_logger.logger.warning(f"⚠️ Empty CSV file: {csv_filename}")
                         frappe.db.set_value('DocType Creation Request', request_doc.name, {
                             'status': 'Failed',
                             'created_doctype': 'Empty File'
                         })
+                        
+                        # Nothing was imported; commit the status, then move the file out of pending
+                        frappe.db.commit()
+                        try:
+                            _move_file(csv_file_path, os.path.join(error_dir, csv_filename))
+                            for index in file_indexes:
+                                index.pop(csv_filename, None)
+                        except Exception as move_error:
+                            migration_logger.logger.error(f"❌ Failed to move {csv_filename} to errors: {str(move_error)}")
                         continue
                     
-                    migration_logger.logger.info(f"📊 Loaded {len(df)} rows from {csv_filename}")
-                    
-                    stored_count = csv_connector.store_raw_data(df, csv_filename, target_doctype)
+                    migration_logger.logger.info(f"📊 Loaded {row_count} rows from {csv_filename}")
                     migration_logger.logger.info(f"📦 Stored {stored_count} raw records for processing")
                     
-                    # Process with JIT conversion in batches
-                    batch_size = int(getattr(settings, 'csv_chunk_size', 1000))
-                    total_results = {"success": 0, "failed": 0, "skipped": 0}
+                    # Process with JIT conversion in batches until the buffer comes back empty.
+                    # Rows left from earlier runs are drained too, so the cap only guards against
+                    # a runaway loop; only the operation time limit can stop short of this file's rows
+                    max_batches = max(_PENDING_MAX_BATCHES, math.ceil(stored_count / batch_size))
+                    total_results, timed_out = _run_buffered_batches(
+                        lambda: csv_connector.process_buffered_data_with_upsert(target_doctype, batch_size),
+                        ('success', 'failed', 'skipped'), max_batches, migration_logger,
+                        is_expired=_operation_deadline()
+                    )
                     
-                    batch_count = 0
-                    max_batches = 100
-                    
-                    while batch_count < max_batches:
-                        batch_count += 1
-                        batch_results = csv_connector.process_buffered_data_with_upsert(target_doctype, batch_size)
-                        
-                        for key in total_results:
-                            total_results[key] += batch_results[key]
-                        
-                        migration_logger.logger.info(f"📈 Batch {batch_count} results: {batch_results}")
-                        
-                        if sum(batch_results.values()) == 0:
-                            break
+                    if timed_out:
+                        # Keep the request approved and its file in place; the next run resumes the buffer
+                        frappe.db.set_value('DocType Creation Request', request_doc.name, 'processing_results',
+                                            json.dumps({**total_results, 'timed_out': True}))
+                        frappe.db.commit()
+                        migration_logger.logger.warning(
+                            f"⏰ {csv_filename} hit the operation time limit after {total_results}; "
+                            f"request {request.name} stays {request_doc.status} for the next run"
+                        )
+                        continue
                     
                     migration_logger.logger.info(f"📈 Final import results for {csv_filename}: {total_results}")
                     
-                    # Move file to processed directory
-                    processed_path = os.path.join(processed_dir, csv_filename)
-                    shutil.move(csv_file_path, processed_path)
-                    migration_logger.logger.info(f"📁 Moved file to processed: {processed_path}")
-                    
                     # FIXED: Update request status using db.set_value to avoid conflicts
                     try:
                         frappe.db.set_value('DocType Creation Request', request_doc.name, {
                             'status': 'Completed',
                             'processing_results': json.dumps(total_results)
                         })
-                        frappe.db.commit()
                         migration_logger.logger.info(f"✅ Successfully completed request: {request.name}")
                     except Exception as update_error:
                         migration_logger.logger.warning(f"⚠️ Could not update completion status: {str(update_error)} - but processing succeeded")
                     
+                    # The import has committed already; commit the status with it, then move the file
+                    frappe.db.commit()
+                    processed_path = os.path.join(processed_dir, csv_filename)
+                    try:
+                        _move_file(csv_file_path, processed_path)
+                        for index in file_indexes:
+                            index.pop(csv_filename, None)
+                        migration_logger.logger.info(f"📁 Moved file to processed: {processed_path}")
+                    except Exception as move_error:
+                        migration_logger.logger.error(f"❌ Failed to move {csv_filename} to processed: {str(move_error)}")
+                    
                     processed_count += 1
                     
                     # Send completion notification
@@ -1368,14 +1584,6 @@ def check_pending_requests_and_process():
                 except Exception as processing_error:
                     migration_logger.logger.error(f"❌ Failed to process CSV {csv_filename}: {str(processing_error)}")
                     
-                    # Move to error directory
-                    try:
-                        error_path = os.path.join(error_dir, csv_filename)
-                        if os.path.exists(csv_file_path):
-                            shutil.move(csv_file_path, error_path)
-                    except:
-                        pass
-                    
                     try:
                         frappe.db.set_value('DocType Creation Request', request_doc.name, {
                             'status': 'Failed',
@@ -1383,11 +1591,31 @@ def check_pending_requests_and_process():
                         })
                     except Exception:
                         pass
+                    
+                    # Part of the import may have committed; commit the status with it, then move the file
+                    frappe.db.commit()
+                    try:
+                        error_path = os.path.join(error_dir, csv_filename)
+                        if os.path.exists(csv_file_path):
+                            _move_file(csv_file_path, error_path)
+                            for index in file_indexes:
+                                index.pop(csv_filename, None)
+                    except Exception as move_error:
+                        migration_logger.logger.error(f"❌ Failed to move {csv_filename} to errors: {str(move_error)}")
                 
             except Exception as e:
                 migration_logger.logger.error(f"❌ Failed to process request {request.name}: {str(e)}")
+                try:
+                    frappe.db.rollback(save_point=savepoint)
+                except Exception:
+                    # Imports and DocType DDL commit on their own, which releases the savepoint
+                    pass
                 continue
+            finally:
+                if request_index % _REQUEST_COMMIT_INTERVAL == 0:
+                    frappe.db.commit()
         
+        frappe.db.commit()
         migration_logger.logger.info(f"🎉 Completed processing {processed_count} approved requests")
         return {"processed": processed_count}
     
@@ -1395,47 +1623,32 @@ def check_pending_requests_and_process():
         migration_logger.logger.error(f"❌ Error in check_pending_requests_and_process: {str(e)}")
         return {"processed": 0}
 
-def send_doctype_creation_request(filename, target_doctype, field_analysis):
-    """ENHANCED: Create DocType creation request with proper error handling"""
+def _get_request_user() -> str:
+    """User that owns approval requests created by the scheduler"""
+    try:
+        from data_migration_tool.data_migration.utils.user_context import UserContextManager
+        return UserContextManager.get_migration_user()
+    except Exception:
+        return frappe.session.user if hasattr(frappe, 'session') and frappe.session.user != 'Guest' else 'Administrator'
+
+def _get_system_managers() -> List[Dict[str, Any]]:
+    """Enabled System Manager users (name, email) from a single join"""
+    return frappe.db.sql("""
+        SELECT DISTINCT u.name, u.email
+        FROM `tabUser` u
+        INNER JOIN `tabHas Role` hr ON u.name = hr.parent AND hr.parenttype = 'User'
+        WHERE hr.role = 'System Manager'
+        AND u.enabled = 1
+        AND u.name != 'Guest'
+    """, as_dict=True)
+
+def _notify_doctype_creation_request(request_name, filename, target_doctype, field_analysis):
+    """Send real-time notifications about a new DocType creation request"""
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
     
     try:
-        # Set proper user context
-        try:
-            from data_migration_tool.data_migration.utils.user_context import UserContextManager
-            current_user = UserContextManager.get_migration_user()
-        except Exception:
-            current_user = frappe.session.user if hasattr(frappe, 'session') and frappe.session.user != 'Guest' else 'Administrator'
-        frappe.set_user(current_user)
-        
-        # Convert numpy types to native Python types
-        safe_field_analysis = convert_numpy_types(field_analysis)
-        
-        # Create the request document
-        request_doc = frappe.get_doc({
-            'doctype': 'DocType Creation Request',
-            'source_file': filename,
-            'suggested_doctype': target_doctype,
-            'field_analysis': json.dumps(safe_field_analysis),
-            'status': 'Pending',
-            'created_by': current_user,
-            'owner': current_user
-        })
-        
-        request_doc.insert(ignore_permissions=True, ignore_mandatory=True)
-        frappe.db.commit()
-        
-        migration_logger.logger.info(f"🔔 Created DocType creation request: {request_doc.name}")
-        
         # Get system managers using SQL query
-        system_managers = frappe.db.sql("""
-            SELECT DISTINCT u.name 
-            FROM `tabUser` u
-            INNER JOIN `tabHas Role` hr ON u.name = hr.parent
-            WHERE hr.role = 'System Manager' 
-            AND u.enabled = 1 
-            AND u.name != 'Guest'
-        """, as_dict=True)
+        system_managers = _get_system_managers()
         
         manager_emails = [manager.name for manager in system_managers]
         if not manager_emails:
@@ -1445,16 +1658,16 @@ def send_doctype_creation_request(filename, target_doctype, field_analysis):
                 manager_emails = [manager.get('name', 'Administrator') for manager in system_managers]
             except Exception:
                 manager_emails = ['Administrator']
-            
+        
         migration_logger.logger.info(f"📤 Found system managers: {manager_emails}")
         
         # Send real-time notifications
         notification_data = {
-            'request_id': request_doc.name,
+            'request_id': request_name,
             'filename': filename,
             'suggested_doctype': target_doctype,
-            'field_count': len(safe_field_analysis.get('fields', {})),
-            'sample_fields': list(safe_field_analysis.get('fields', {}).keys())[:5]
+            'field_count': len(field_analysis.get('fields', {})),
+            'sample_fields': list(field_analysis.get('fields', {}).keys())[:5]
         }
         
         for manager in manager_emails:
@@ -1478,6 +1691,76 @@ def send_doctype_creation_request(filename, target_doctype, field_analysis):
             migration_logger.logger.warning(f"⚠️ Failed to send general notification: {str(general_notify_error)}")
         
         migration_logger.logger.info(f"📤 Sent real-time notifications for DocType creation request")
+    except Exception as e:
+        migration_logger.logger.warning(f"⚠️ Failed to send notifications for {request_name}: {str(e)}")
+
+def create_doctype_creation_requests(requests: List[Tuple[str, str, dict]]) -> List[Optional[str]]:
+    """Insert approval requests for (filename, target_doctype, field_analysis) tuples with one commit
+
+    Returns the request names in input order, None where that request could not be created.
+    """
+    from data_migration_tool.data_migration.utils.logger_config import migration_logger
+    
+    current_user = _get_request_user()
+    frappe.set_user(current_user)
+    
+    # Each insert runs the full controller; a savepoint keeps one bad file from sinking the rest
+    names = []
+    for index, (filename, target_doctype, field_analysis) in enumerate(requests):
+        savepoint = f"creation_request_{index}"
+        frappe.db.savepoint(savepoint)
+        try:
+            request_doc = frappe.get_doc({
+                'doctype': 'DocType Creation Request',
+                'source_file': filename,
+                'suggested_doctype': target_doctype,
+                'field_analysis': dumps_numpy_safe(field_analysis),
+                'status': 'Pending',
+                'created_by': current_user,
+                'owner': current_user
+            })
+            request_doc.insert(ignore_permissions=True, ignore_mandatory=True)
+            names.append(request_doc.name)
+        except Exception as e:
+            frappe.db.rollback(save_point=savepoint)
+            migration_logger.logger.error(f"❌ Failed to create DocType creation request for {filename}: {str(e)}")
+            names.append(None)
+    
+    frappe.db.commit()
+    migration_logger.logger.info(f"🔔 Created {sum(1 for name in names if name)} DocType creation requests")
+    
+    for name, (filename, target_doctype, field_analysis) in zip(names, requests, strict=True):
+        if name:
+            _notify_doctype_creation_request(name, filename, target_doctype, field_analysis)
+    
+    return names
+
+def send_doctype_creation_request(filename, target_doctype, field_analysis):
+    """ENHANCED: Create DocType creation request with proper error handling"""
+    from data_migration_tool.data_migration.utils.logger_config import migration_logger
+    
+    try:
+        # Set proper user context
+        current_user = _get_request_user()
+        frappe.set_user(current_user)
+        
+        # Create the request document
+        request_doc = frappe.get_doc({
+            'doctype': 'DocType Creation Request',
+            'source_file': filename,
+            'suggested_doctype': target_doctype,
+            'field_analysis': dumps_numpy_safe(field_analysis),
+            'status': 'Pending',
+            'created_by': current_user,
+            'owner': current_user
+        })
+        
+        request_doc.insert(ignore_permissions=True, ignore_mandatory=True)
+        frappe.db.commit()
+        
+        migration_logger.logger.info(f"🔔 Created DocType creation request: {request_doc.name}")
+        
+        _notify_doctype_creation_request(request_doc.name, filename, target_doctype, field_analysis)
         
         return request_doc.name
         
@@ -1487,19 +1770,14 @@ def send_doctype_creation_request(filename, target_doctype, field_analysis):
         migration_logger.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
         raise e
 
-def compute_schema_fingerprint(headers: list, data_sample: dict = None) -> str:
-    """
-    Compute a unique fingerprint for CSV schema based on headers and data types
-    """
+def _schema_fingerprint_parts(headers: list, data_sample: dict = None) -> Tuple[list, list]:
+    """Sorted normalized headers plus simple per-header type tags"""
     # Sort headers to ensure consistent fingerprints regardless of column order
     sorted_headers = sorted([h.strip().lower() for h in headers])
     
-    # Create fingerprint from headers
-    headers_string = '|'.join(sorted_headers)
-    
     # Optionally include data type information for more precision
+    type_info = []
     if data_sample:
-        type_info = []
         for header in sorted_headers:
             if header in data_sample:
                 sample_value = str(data_sample[header])
@@ -1510,26 +1788,48 @@ def compute_schema_fingerprint(headers: list, data_sample: dict = None) -> str:
                     type_info.append(f"{header}:float")
                 else:
                     type_info.append(f"{header}:string")
-        
-        if type_info:
-            headers_string += '||' + '|'.join(type_info)
     
-    # Generate MD5 hash
+    return sorted_headers, type_info
+
+def compute_schema_fingerprint(headers: list, data_sample: dict = None, version: int = None) -> str:
+    """
+    Compute a unique fingerprint for CSV schema based on headers and data types
+    """
+    version = version or FINGERPRINT_VERSION
+    sorted_headers, type_info = _schema_fingerprint_parts(headers, data_sample)
+    
+    if version >= 2:
+        # Non-cryptographic hash over a canonical serialization
+        payload = orjson.dumps({'c': sorted_headers, 't': type_info}, option=orjson.OPT_SORT_KEYS)
+        return 'v2:' + xxhash.xxh3_64(payload).hexdigest()
+    
+    # Legacy MD5 over the pipe-joined headers
+    headers_string = '|'.join(sorted_headers)
+    if type_info:
+        headers_string += '||' + '|'.join(type_info)
     return hashlib.md5(headers_string.encode('utf-8')).hexdigest()
 
+def schema_fingerprint_candidates(headers: list, data_sample: dict = None) -> List[str]:
+    """Current fingerprint first, then the legacy one so older registry entries still match"""
+    current = compute_schema_fingerprint(headers, data_sample)
+    if FINGERPRINT_VERSION >= 2:
+        return [current, compute_schema_fingerprint(headers, data_sample, version=1)]
+    return [current]
+
 def find_existing_doctype_by_schema(headers: list, data_sample: dict = None) -> tuple:
     """
     ENHANCED: Find existing DocType by analyzing CSV schema fingerprint
     Returns: (doctype_name, registry_id) or (None, None)
     """
     try:
-        # Generate schema fingerprint
-        schema_fingerprint = compute_schema_fingerprint(headers, data_sample)
+        # Generate schema fingerprint (current and legacy formats)
+        fingerprints = schema_fingerprint_candidates(headers, data_sample)
+        schema_fingerprint = fingerprints[0]
         
         # Check if we have processed this exact schema before
         existing_registry = frappe.db.get_value(
             'CSV Schema Registry',
-            {'schema_fingerprint': schema_fingerprint},
+            {'schema_fingerprint': ['in', fingerprints]},
             ['target_doctype', 'name'],
             as_dict=True
         )
@@ -1545,6 +1845,7 @@ def find_existing_doctype_by_schema(headers: list, data_sample: dict = None) ->
             else:
                 # Clean up orphaned registry entry
                 frappe.delete_doc('CSV Schema Registry', existing_registry.name, ignore_permissions=True)
+                invalidate_learned_patterns()
                 
         # Check for similar schemas (80% header match)
         similar_registries = frappe.get_all(
@@ -1594,10 +1895,11 @@ def register_csv_schema(filename: str, headers: list, target_doctype: str, data_
     ENHANCED: Register CSV schema with comprehensive metadata
     """
     try:
-        schema_fingerprint = compute_schema_fingerprint(headers, data_sample)
+        fingerprints = schema_fingerprint_candidates(headers, data_sample)
+        schema_fingerprint = fingerprints[0]
         
         # Check if already exists
-        existing = frappe.db.exists('CSV Schema Registry', {'schema_fingerprint': schema_fingerprint})
+        existing = frappe.db.exists('CSV Schema Registry', {'schema_fingerprint': ['in', fingerprints]})
         if existing:
             # Update existing record
             doc = frappe.get_doc('CSV Schema Registry', existing)
@@ -1622,6 +1924,7 @@ def register_csv_schema(filename: str, headers: list, target_doctype: str, data_
         
         registry_doc.insert(ignore_permissions=True)
         frappe.db.commit()
+        invalidate_learned_patterns()
         
         from data_migration_tool.data_migration.utils.logger_config import migration_logger
         migration_logger.logger.info(f"📝 Registered CSV schema: {target_doctype} (fingerprint: {schema_fingerprint[:8]}...)")
@@ -1653,6 +1956,7 @@ def register_csv_schema(source_file: str, headers: list, target_doctype: str, da
         
         registry_doc.insert(ignore_permissions=True, ignore_if_duplicate=True)
         frappe.db.commit()
+        invalidate_learned_patterns()
         
         return registry_doc.name
         
@@ -1753,6 +2057,10 @@ def cleanup_job_context():
 def on_settings_update(doc=None, method=None):
     """Handle Migration Settings updates"""
     from data_migration_tool.data_migration.utils.logger_config import migration_logger
+    from data_migration_tool.data_migration.utils.migration_config import migration_config
+    
+    # Drop values resolved from the previous Settings document
+    migration_config.reload()
     migration_logger.logger.info("Migration Settings updated")
     
 def cleanup_old_logs():
@@ -0,0 +1,41 @@
+# Tests for the schema detection helpers in scheduler_tasks
+import pandas as pd
+from frappe.tests.utils import FrappeTestCase
+
+from data_migration_tool.data_migration.utils.scheduler_tasks import (
+    IntelligentSchemaDetector,
+    _as_str_series
+)
+
+
+class TestIntelligentSchemaDetector(FrappeTestCase):
+    def setUp(self):
+        self.detector = IntelligentSchemaDetector()
+        # 'status' holds two values over 40 rows, so it is profiled as a categorical
+        self.df = pd.DataFrame({
+            'customer_name': [f"Customer {i}" for i in range(40)],
+            'email': [f"customer{i}@example.com" for i in range(40)],
+            'status': ['Active', 'Inactive'] * 20
+        })
+
+    def test_low_cardinality_column_is_categorized(self):
+        categorized = self.detector._categorize_low_cardinality(self.df)
+        self.assertIsInstance(categorized['status'].dtype, pd.CategoricalDtype)
+        self.assertEqual(categorized['customer_name'].dtype, object)
+        # The caller's frame keeps its original dtypes
+        self.assertEqual(self.df['status'].dtype, object)
+
+    def test_analyze_profiles_low_cardinality_column(self):
+        analysis = self.detector.analyze_csv_structure_advanced(self.df, 'customers.csv')
+        status = analysis['column_profiles']['status']
+        self.assertEqual(status['unique_count'], 2)
+        self.assertEqual(status['max_length'], len('Inactive'))
+        self.assertEqual(set(status['sample_values']), {'Active', 'Inactive'})
+
+    def test_as_str_series_handles_categoricals(self):
+        series = pd.Series(['Active', 'Inactive', 'Active'], dtype='category')
+        self.assertEqual(_as_str_series(series).str.len().tolist(), [6, 8, 6])
+
+    def test_as_str_series_keeps_text_columns(self):
+        series = pd.Series(['a', 'b'], dtype=object)
+        self.assertIs(_as_str_series(series), series)
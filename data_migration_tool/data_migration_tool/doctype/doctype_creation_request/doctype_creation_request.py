@@ -74,7 +74,7 @@ class DocTypeCreationRequest(Document):
         
         # Validate file extension
         from data_migration_tool.data_migration.utils.config_validator import ConfigValidator
-        allowed_extensions = ['.csv', '.xlsx', '.xls']
+        allowed_extensions = ('.csv', '.xlsx', '.xls')
         if not ConfigValidator.validate_file_extension(self.source_file, allowed_extensions):
             frappe.throw(f"Invalid file type. Allowed: {', '.join(allowed_extensions)}")
         
@@ -5,7 +5,12 @@ import frappe
 import os
 from frappe.model.document import Document, flt
 from frappe.utils import now, cint
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+def _list_csv_files(directory: str) -> List[str]:
+    """Names of regular .csv files in a directory, from a single scandir pass"""
+    with os.scandir(directory) as entries:
+        return [entry.name for entry in entries if entry.name.endswith('.csv') and entry.is_file()]
 
 class MigrationSettings(Document):
     """Enhanced Migration Settings with JIT processing support"""
@@ -245,8 +250,7 @@ class MigrationSettings(Document):
                 
                 # Count files
                 try:
-                    files = [f for f in os.listdir(self.csv_watch_directory)
-                            if f.endswith('.csv') and os.path.isfile(os.path.join(self.csv_watch_directory, f))]
+                    files = _list_csv_files(self.csv_watch_directory)
                     result["file_count"] = len(files)
                     result["csv_files"] = files[:10]  # Show first 10 CSV files
                 except:
@@ -280,7 +284,7 @@ class MigrationSettings(Document):
                 if not os.path.exists(self.csv_watch_directory):
                     return {"status": "error", "message": "CSV watch directory does not exist"}
                 
-                csv_files = [f for f in os.listdir(self.csv_watch_directory) if f.endswith('.csv')]
+                csv_files = _list_csv_files(self.csv_watch_directory)
                 if not csv_files:
                     return {"status": "warning", "message": "No CSV files found to process"}
                 
@@ -371,8 +375,7 @@ class MigrationSettings(Document):
             
             if os.path.exists(self.csv_watch_directory):
                 # Count files in main directory
-                files = [f for f in os.listdir(self.csv_watch_directory) 
-                        if f.endswith('.csv') and os.path.isfile(os.path.join(self.csv_watch_directory, f))]
+                files = _list_csv_files(self.csv_watch_directory)
                 stats["files"] = len(files)
                 
                 # Count files in subdirectories
@@ -380,8 +383,7 @@ class MigrationSettings(Document):
                 for subdir in subdirs:
                     subdir_path = os.path.join(self.csv_watch_directory, subdir)
                     if os.path.exists(subdir_path):
-                        subdir_files = [f for f in os.listdir(subdir_path) 
-                                      if f.endswith('.csv') and os.path.isfile(os.path.join(subdir_path, f))]
+                        subdir_files = _list_csv_files(subdir_path)
                         stats[subdir] = len(subdir_files)
             
             return stats
@@ -403,11 +405,10 @@ class MigrationSettings(Document):
             for subdir in ['processed', 'errors']:
                 subdir_path = os.path.join(self.csv_watch_directory, subdir)
                 if os.path.exists(subdir_path):
-                    for filename in os.listdir(subdir_path):
-                        file_path = os.path.join(subdir_path, filename)
-                        if os.path.isfile(file_path):
-                            if os.path.getmtime(file_path) < cutoff_time:
-                                os.remove(file_path)
+                    with os.scandir(subdir_path) as entries:
+                        for entry in entries:
+                            if entry.is_file() and entry.stat().st_mtime < cutoff_time:
+                                os.remove(entry.path)
                                 deleted_count += 1
             
             return {
@@ -436,8 +437,7 @@ class MigrationSettings(Document):
             if not os.path.exists(self.csv_watch_directory):
                 return {'status': 'error', 'message': 'CSV watch directory does not exist'}
             # Count CSV files
-            csv_files = [f for f in os.listdir(self.csv_watch_directory)
-                        if f.endswith('.csv') and os.path.isfile(os.path.join(self.csv_watch_directory, f))]
+            csv_files = _list_csv_files(self.csv_watch_directory)
             if not csv_files:
                 return {'status': 'warning', 'message': 'No CSV files found to process'}
             # Enqueue intelligent processing